@@ -0,0 +1,169 @@
+##
+# Author : Christian Garcia
+# Project: AiPlayer class for poker game
+#
+import time
+from random import Random
+from cardfunctions import handStrength
+
+class AiPlayer:
+  """ Computer player that bets from its equity against a range """
+  def __init__(self, budget=0.005, raiseEquity=0.7, seed=None):
+    """
+    Initializes the variables for the player
+
+        Parameters:
+            budget(float) - the seconds of thinking for each decision,
+                            such as 0.005 for simulations or 0.2 when
+                            playing against a person
+            raiseEquity(float) - the equity from which the player raises
+            seed(int) - seeds the sampling, so decisions can be replayed
+
+    """
+    self._budget = budget
+    self._raiseEquity = raiseEquity
+    self._random = Random(seed)
+    self._hand = []
+    self._left = 0
+    self._deck = []
+    self._range = None
+    self._pot = 0
+    self._toCall = 0
+    self._spent = 0.0
+    self._samples = 0
+    self._points = 0
+
+  def startDecision(self, hole, board, pot, toCall, opponentRange=None):
+    """
+    Starts thinking about a new decision
+
+        Parameters:
+            hole(list of cards) - the player's two hole cards
+            board(list of cards) - the middle cards dealt so far
+            pot(int) - the money in the pot, including any bet to call
+            toCall(int) - the money the player has to put in to call
+            opponentRange(list of hands) - the hands the opponent can
+                                           hold, any two cards by default
+
+    """
+    self._hand = list(hole) + list(board)
+    self._left = 5 - len(board)
+    self._deck = [card for card in range(52) if card not in self._hand]
+    self._range = None
+    if opponentRange is not None:
+      self._range = [list(hand) for hand in opponentRange
+                     if not set(hand) & set(self._hand)]
+      if not self._range:
+        raise RuntimeError("the range has no hand that can be dealt")
+    self._pot = pot
+    self._toCall = toCall
+    self._spent = 0.0
+    self._samples = 0
+    self._points = 0
+
+  def think(self, seconds=None):
+    """
+    Samples deals for a while, stopping early once the budget is spent,
+    so a decision can be thought about a little at a time
+
+        Parameters:
+            seconds(float) - the most seconds to think for now, the rest
+                             of the budget by default
+
+        Returns:
+            (bool) - True once the budget is spent and the decision is
+                     ready
+
+    """
+    left = self._budget - self._spent
+    if seconds is None or seconds > left:
+      seconds = left
+    if seconds <= 0:
+      return self.isReady()
+    start = time.perf_counter()
+    deadline = start + seconds
+
+    # Look at the clock only every few samples
+    while True:
+      for i in range(_SAMPLES_PER_CHECK):
+        self._sample()
+      if time.perf_counter() >= deadline:
+        break
+
+    self._spent += time.perf_counter() - start
+    return self.isReady()
+
+  def isReady(self):
+    """
+    Checks if the budget of the decision is spent
+
+        Returns:
+            (bool) - True once the decision is ready
+
+    """
+    return self._spent >= self._budget
+
+  def getEquity(self):
+    """
+    Gets the share of the pot the player expects from the deals sampled
+    so far, counting a tie as half
+
+        Returns:
+            (float) - the equity, 0.5 before any deal is sampled
+
+    """
+    if self._samples == 0:
+      return 0.5
+    return self._points / (2 * self._samples)
+
+  def getSamples(self):
+    """
+    Gets the number of deals sampled for the decision
+
+        Returns:
+            (int) - the number of samples
+
+    """
+    return self._samples
+
+  def decide(self):
+    """
+    Picks an action from the equity and the pot odds
+
+    The player folds when its equity is less than the share of the final
+    pot it has to pay to call, raises when its equity is at least
+    raiseEquity, and calls otherwise. Calling nothing is a check.
+
+        Returns:
+            (str) - "fold", "call" or "raise"
+
+    """
+    equity = self.getEquity()
+    if self._toCall > 0 and equity < self._toCall / (self._pot + self._toCall):
+      return "fold"
+    if equity >= self._raiseEquity:
+      return "raise"
+    return "call"
+
+  def _sample(self):
+    """ Deals a random opponent hand and runout and scores the deal """
+    if self._range is None:
+      cards = self._random.sample(self._deck, 2 + self._left)
+      opponent = cards[:2]
+      runout = cards[2:]
+    else:
+      opponent = self._random.choice(self._range)
+      cards = self._random.sample(self._deck, 2 + self._left)
+      runout = [card for card in cards if card not in opponent][:self._left]
+
+    board = self._hand[2:] + runout
+    mine = handStrength(self._hand + runout)
+    theirs = handStrength(opponent + board)
+    self._samples += 1
+    if mine > theirs:
+      self._points += 2
+    elif mine == theirs:
+      self._points += 1
+
+# The number of deals sampled between looks at the clock
+_SAMPLES_PER_CHECK = 16
@@ -0,0 +1,200 @@
+##
+# Author : Christian Garcia
+# Project: Batched card functions
+#
+import numpy as np
+from cardfunctions import handStrength, HIGH_CARD, PAIR, TWO_PAIRS, \
+  THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, \
+  STRAIGHT_FLUSH, CATEGORY_SHIFT
+
+def main():
+  """ Checks the batched strengths against handStrength on random hands """
+  rng = np.random.default_rng(0)
+  hands = np.argsort(rng.random((10000, 52)), axis=1)[:, :7]
+  strengths = handStrengths(hands)
+
+  mismatches = 0
+  for hand, strength in zip(hands.tolist(), strengths.tolist()):
+    if handStrength(hand) != strength:
+      mismatches += 1
+  print("Checked", len(hands), "hands,", mismatches, "mismatches")
+
+def handStrengths(hands):
+  """
+  Scores many hands at once, the batched counterpart of handStrength
+
+      Parameters:
+          hands(array of cards) - an (N, 7) array of cards (0-51), hands
+                                  of 5 or 6 cards are also accepted
+
+      Returns:
+          (array of int) - an (N,) array of strengths, equal to what
+                           handStrength returns for each hand
+
+  """
+  hands = np.asarray(hands, dtype=np.int64)
+  if hands.ndim != 2 or hands.shape[1] > 7:
+    raise RuntimeError("hands must be an (N, 7) array of cards")
+
+  strengths = np.empty(len(hands), dtype=np.int32)
+
+  # Work through big batches in chunks to keep the temporaries small
+  for start in range(0, len(hands), _CHUNK_SIZE):
+    chunk = hands[start:start + _CHUNK_SIZE]
+    strengths[start:start + _CHUNK_SIZE] = _chunkStrengths(chunk)
+
+  return strengths
+
+def _chunkStrengths(hands):
+  """
+  Scores a chunk of hands with whole-array operations
+
+      Parameters:
+          hands(array of cards) - an (N, 7) array of cards
+
+      Returns:
+          (array of int) - the strength of each hand
+
+  """
+  bits = _CARD_BITS[hands]
+  suits = _CARD_SUITS[hands]
+
+  # Masks of the ranks held at least once, twice, three and four times
+  ones = np.zeros(len(hands), dtype=np.int32)
+  twos = np.zeros_like(ones)
+  threes = np.zeros_like(ones)
+  fours = np.zeros_like(ones)
+  for column in bits.T:
+    fours |= threes & column
+    threes |= twos & column
+    twos |= ones & column
+    ones |= column
+  trips = threes & ~fours
+  pairs = twos & ~threes
+
+  # The ranks held in the flush suit, if there is one
+  flushSuit = _FLUSH_SUITS[_SUIT_KEYS[suits].sum(axis=1)]
+  isFlush = flushSuit >= 0
+  flushMask = np.zeros_like(ones)
+  for suitColumn, column in zip(suits.T, bits.T):
+    flushMask |= np.where(suitColumn == flushSuit, column, 0)
+
+  quadRank = _HIGHEST_BIT[fours]
+  tripRank = _HIGHEST_BIT[trips]
+  pairRank = _HIGHEST_BIT[pairs]
+  fullPairRank = _HIGHEST_BIT[_CLEAR_HIGHEST[trips] | pairs]
+  secondPairRank = _HIGHEST_BIT[_CLEAR_HIGHEST[pairs]]
+  withoutQuads = ones & ~fours
+  withoutTrips = ones & ~trips
+  withoutPair = ones & ~_HIGHEST_ONLY[pairs]
+  withoutPairs = ones & ~(_HIGHEST_ONLY[pairs] |
+                          _HIGHEST_ONLY[_CLEAR_HIGHEST[pairs]])
+
+  straightHigh = _straightHighs(ones)
+  flushStraightHigh = _straightHighs(flushMask)
+
+  conditions = [
+    isFlush & (flushStraightHigh >= 0),
+    fours > 0,
+    (tripRank >= 0) & (fullPairRank >= 0),
+    isFlush,
+    straightHigh >= 0,
+    tripRank >= 0,
+    secondPairRank >= 0,
+    pairRank >= 0,
+  ]
+  choices = [
+    _encode(STRAIGHT_FLUSH, [flushStraightHigh + 1]),
+    _encode(FOUR_OF_A_KIND, [quadRank + 1] + _topRanks(withoutQuads, 1)),
+    _encode(FULL_HOUSE, [tripRank + 1, fullPairRank + 1]),
+    _encode(FLUSH, _topRanks(flushMask, 5)),
+    _encode(STRAIGHT, [straightHigh + 1]),
+    _encode(THREE_OF_A_KIND, [tripRank + 1] + _topRanks(withoutTrips, 2)),
+    _encode(TWO_PAIRS, [pairRank + 1, secondPairRank + 1] +
+            _topRanks(withoutPairs, 1)),
+    _encode(PAIR, [pairRank + 1] + _topRanks(withoutPair, 3)),
+  ]
+  highCard = _encode(HIGH_CARD, _topRanks(ones, 5))
+
+  return np.select(conditions, choices, default=highCard)
+
+def _straightHighs(masks):
+  """
+  Finds the highest card of a straight in each rank mask
+
+      Parameters:
+          masks(array of int) - 13-bit masks of the ranks in each hand
+
+      Returns:
+          (array of int) - the rank of the straight's highest card, or -1
+
+  """
+  starts = masks & (masks >> 1) & (masks >> 2) & (masks >> 3) & (masks >> 4)
+  highs = np.where(starts > 0, _HIGHEST_BIT[starts] + 4, -1)
+  wheel = (masks & 0x100F) == 0x100F
+  return np.where((highs < 0) & wheel, 3, highs)
+
+def _topRanks(masks, amount):
+  """
+  Takes the highest ranks out of each rank mask
+
+      Parameters:
+          masks(array of int) - 13-bit masks of ranks
+          amount(int) - the number of ranks to take
+
+      Returns:
+          (list of arrays) - rank + 1 of each rank taken, or 0 when a
+                             mask runs out of ranks
+
+  """
+  ranks = []
+  for i in range(amount):
+    ranks.append(_HIGHEST_BIT[masks] + 1)
+    masks = _CLEAR_HIGHEST[masks]
+  return ranks
+
+def _encode(category, ranks):
+  """
+  Packs a category and rank arrays the same way as cardfunctions
+
+      Parameters:
+          category(int) - the category of the hands
+          ranks(list of arrays) - rank + 1 of the deciding ranks, most
+                                  important first
+
+      Returns:
+          (array of int) - the strength of each hand
+
+  """
+  strength = category << CATEGORY_SHIFT
+  shift = CATEGORY_SHIFT
+  for rank in ranks:
+    shift -= 4
+    strength = strength | (rank << shift)
+  return strength
+
+_CHUNK_SIZE = 1 << 14
+
+# The rank bit (Ace high) and the suit of every card
+_CARD_BITS = np.left_shift(1, (np.arange(52) // 4 - 1) % 13).astype(np.int32)
+_CARD_SUITS = (np.arange(52) % 4).astype(np.int32)
+
+# Suit counts are packed 3 bits per suit, the flush suit of every packed
+# count is -1 when no suit has 5 cards
+_SUIT_KEYS = np.left_shift(1, 3 * np.arange(4)).astype(np.int32)
+_FLUSH_SUITS = np.full(1 << 12, -1, dtype=np.int32)
+for _suit in range(4):
+  _FLUSH_SUITS[((np.arange(1 << 12) >> (3 * _suit)) & 7) >= 5] = _suit
+
+# The highest set bit of every 13-bit mask (-1 for an empty mask), the
+# mask with only that bit, and the mask without it
+_HIGHEST_BIT = np.full(1 << 13, -1, dtype=np.int32)
+for _bit in range(13):
+  _HIGHEST_BIT[1 << _bit:2 << _bit] = _bit
+_HIGHEST_ONLY = np.where(_HIGHEST_BIT >= 0,
+                         np.left_shift(1, np.maximum(_HIGHEST_BIT, 0)),
+                         0).astype(np.int32)
+_CLEAR_HIGHEST = (np.arange(1 << 13) & ~_HIGHEST_ONLY).astype(np.int32)
+
+if __name__ == "__main__":
+  main()
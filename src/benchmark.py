@@ -0,0 +1,247 @@
+##
+# Author : Christian Garcia
+# Project: Benchmarks for the card functions
+#
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from array import array
+from itertools import combinations
+from cardfunctions import checkHand, handStrength, compareHands, handCache
+from deck import Deck
+
+def main():
+  """ Runs the benchmarks and checks them against the baseline """
+  parser = argparse.ArgumentParser(description="Times the card functions")
+  parser.add_argument("--hands", type=int, default=_DEFAULT_HANDS,
+                      help="the number of hands in each corpus")
+  parser.add_argument("--seed", type=int, default=0,
+                      help="seeds the corpora and the deck shuffles")
+  parser.add_argument("--all", action="store_true",
+                      help="also score all 133,784,560 seven-card hands")
+  parser.add_argument("--output", help="where to write the results as JSON")
+  parser.add_argument("--baseline", default=BASELINE_PATH,
+                      help="the results to compare against")
+  parser.add_argument("--save-baseline", action="store_true",
+                      help="store these results as the new baseline")
+  parser.add_argument("--tolerance", type=float, default=_TOLERANCE,
+                      help="the fraction slower than the baseline allowed")
+  args = parser.parse_args()
+
+  results = runBenchmarks(args.hands, args.seed, args.all)
+  for name, result in results["benchmarks"].items():
+    print("%-20s %12.0f %s/s   p50 %7.2f us   p99 %7.2f us" %
+          (name, result["perSecond"], result["unit"], result["p50Micros"],
+           result["p99Micros"]))
+
+  if args.output:
+    _writeJson(args.output, results)
+  if args.save_baseline:
+    _writeJson(args.baseline, results)
+    print("Saved the baseline to", args.baseline)
+    return
+
+  if not os.path.exists(args.baseline):
+    print("No baseline at", args.baseline + ", run with --save-baseline")
+    return
+  with open(args.baseline) as file:
+    baseline = json.load(file)
+  slower = compareResults(results, baseline, args.tolerance)
+  if slower:
+    for name, current, previous in slower:
+      print("SLOWER: %s ran at %.0f/s against a baseline of %.0f/s" %
+            (name, current, previous), file=sys.stderr)
+    sys.exit(1)
+  print("No benchmark is more than %d%% slower than the baseline" %
+        (100 * args.tolerance))
+
+def runBenchmarks(hands=None, seed=0, everyHand=False):
+  """
+  Times the card functions on fixed corpora of hands
+
+      Parameters:
+          hands(int) - the number of hands in each corpus
+          seed(int) - seeds the corpora and the deck shuffles
+          everyHand(bool) - True to also score every seven-card hand,
+                            which takes several minutes
+
+      Returns:
+          (dict) - the machine the benchmarks ran on and the results of
+                   each benchmark, as written to the JSON file
+
+  """
+  if hands is None:
+    hands = _DEFAULT_HANDS
+  generator = random.Random(seed)
+  randomHands = [generator.sample(range(52), 7) for i in range(hands)]
+  flushHands = [_flushHand(generator) for i in range(hands)]
+  showdowns = [generator.sample(range(52), 9) for i in range(hands)]
+
+  benchmarks = {}
+  handCache().clear()
+  benchmarks["checkHand random"] = _timeCalls(checkHand, randomHands)
+  handCache().clear()
+  benchmarks["checkHand flush"] = _timeCalls(checkHand, flushHands)
+  benchmarks["handStrength random"] = _timeCalls(handStrength, randomHands)
+  benchmarks["handStrength flush"] = _timeCalls(handStrength, flushHands)
+  benchmarks["compareHands"] = _timeCalls(_showdown, showdowns,
+                                          "showdowns")
+
+  # The deck uses the random module itself
+  random.seed(seed)
+  benchmarks["deck shuffle"] = _timeCalls(_shuffleDeck,
+                                          [None] * (hands // 10),
+                                          "decks")
+  benchmarks["deal"] = _timeCalls(_deal, [Deck()] * (hands // 10), "deals")
+
+  if everyHand:
+    benchmarks["handStrength all"] = _timeCalls(handStrength,
+                                                combinations(range(52), 7),
+                                                sampleEvery=64)
+
+  return {
+    "python": platform.python_version(),
+    "machine": platform.machine(),
+    "processor": platform.processor(),
+    "seed": seed,
+    "hands": hands,
+    "benchmarks": benchmarks,
+  }
+
+def compareResults(results, baseline, tolerance=None):
+  """
+  Finds the benchmarks that ran slower than in the baseline
+
+      Parameters:
+          results(dict) - the results, as returned by runBenchmarks
+          baseline(dict) - earlier results to compare against
+          tolerance(float) - the fraction slower than the baseline allowed
+
+      Returns:
+          (list of tuples) - the name, speed and baseline speed of each
+                             benchmark that is too slow
+
+  """
+  if tolerance is None:
+    tolerance = _TOLERANCE
+  slower = []
+  for name, result in results["benchmarks"].items():
+    previous = baseline["benchmarks"].get(name)
+    if previous is None:
+      continue
+    if result["perSecond"] < previous["perSecond"] * (1 - tolerance):
+      slower.append((name, result["perSecond"], previous["perSecond"]))
+  return slower
+
+def _timeCalls(function, inputs, unit="hands", sampleEvery=1):
+  """
+  Calls a function on every input, timing the run and single calls
+
+      Parameters:
+          function(function) - the function being timed
+          inputs(iterable) - the argument of each call
+          unit(str) - what one call handles
+          sampleEvery(int) - only every this many calls are timed alone
+
+      Returns:
+          (dict) - the number of calls, calls per second and the median
+                   and 99th percentile time of one call
+
+  """
+  latencies = array('d')
+  clock = time.perf_counter
+  calls = 0
+  start = clock()
+  for value in inputs:
+    if calls % sampleEvery:
+      function(value)
+    else:
+      before = clock()
+      function(value)
+      latencies.append(clock() - before)
+    calls += 1
+  seconds = clock() - start
+
+  latencies = sorted(latencies)
+  return {
+    "unit": unit,
+    "calls": calls,
+    "seconds": seconds,
+    "perSecond": calls / seconds,
+    "p50Micros": 1e6 * latencies[len(latencies) // 2],
+    "p99Micros": 1e6 * latencies[min(len(latencies) - 1,
+                                     len(latencies) * 99 // 100)],
+  }
+
+def _flushHand(generator):
+  """
+  Picks a hand with at least five cards of one suit, the slowest kind of
+  hand for the old checks
+
+      Parameters:
+          generator(Random) - the random numbers used
+
+      Returns:
+          (list of cards) - seven different cards
+
+  """
+  suit = generator.randrange(4)
+  suited = generator.randint(5, 7)
+  hand = generator.sample(range(suit, 52, 4), suited)
+  others = [card for card in range(52) if card % 4 != suit]
+  hand += generator.sample(others, 7 - suited)
+  generator.shuffle(hand)
+  return hand
+
+def _showdown(cards):
+  """
+  Compares two hands that share a board, as at the end of a round
+
+      Parameters:
+          cards(list of cards) - two hole cards each, then five middle cards
+
+  """
+  board = cards[4:]
+  return compareHands(handStrength(cards[:2] + board),
+                      handStrength(cards[2:4] + board))
+
+def _shuffleDeck(unused):
+  """ Makes and shuffles a deck, as at the start of a game """
+  deck = Deck()
+  deck.shuffle()
+
+def _deal(deck):
+  """ Shuffles the deck and deals one round, as the game does """
+  deck.shuffle()
+  deck.draw(2)
+  deck.draw(2)
+  deck.draw(3)
+  deck.draw(1)
+  deck.draw(1)
+
+def _writeJson(path, results):
+  """
+  Writes the results to a JSON file
+
+      Parameters:
+          path(str) - the file to write
+          results(dict) - the results, as returned by runBenchmarks
+
+  """
+  with open(path, "w") as file:
+    json.dump(results, file, indent=2)
+    file.write("\n")
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "benchmark_baseline.json")
+
+_DEFAULT_HANDS = 100000
+# Timings are noisy, so only a clear slowdown fails
+_TOLERANCE = 0.2
+
+if __name__ == "__main__":
+  main()
@@ -2,6 +2,8 @@
 # Author : Christian Garcia
 # Project: Card class for poker game
 #
+import os
+import pygame
 from imagesprite import ImageSprite
 
 class Card(ImageSprite):
@@ -16,26 +18,33 @@ class Card(ImageSprite):
             num(int) - the int associated with this card's image/value
 
     """
-    self._images = self._createImageDict()
-    self._file = "../DECK/" + self._images[num]
-    super().__init__(x, y, self._file)
+    super().__init__(x, y, cardImage(num))
     self._layer = 1
     self._faceUp = True
     self._num = num
-    self._x = x
-    self._y = y
 
   def flip(self):
     """ Flips this card by changing its image """
+    self._faceUp = not self._faceUp
     if self._faceUp:
-      super().loadImage(self._x, self._y, "../DECK/b.gif")
-      self._faceUp = False
+      self.image = cardImage(self._num)
     else:
-      super().loadImage(self._x, self._y, self._file)
-      self._faceUp = True
+      self.image = cardImage(BACK)
+    self.dirty = 1
+
+  def setFaceUp(self, faceUp):
+    """
+    Turns this card face up or face down
+
+        Parameters:
+            faceUp(bool) - True to show the face, False to show the back
+
+    """
+    if faceUp != self._faceUp:
+      self.flip()
 
   def getNumber(self):
-    """ 
+    """
     Gets the number of this card (0-51) associated with its image/value
 
         Returns:
@@ -53,28 +62,116 @@ class Card(ImageSprite):
             y(int) - the new y coordinate of the top of the card
 
     """
-    super().__init__(x, y, self._file)
-    self._x = x
-    self._y = y
-
-  def _createImageDict(self):
+    self.rect.x = x
+    self.rect.y = y - self.rect.height
+    self.dirty = 1
+
+class CardPool:
+  """ Object to keep one Card for each card, reused hand after hand """
+  def __init__(self):
+    """ Initializes the pool, the cards are made when first needed """
+    self._cards = None
+    self._out = [False] * 52
+
+  def checkOut(self, num, x, y):
     """
-    Creates a dictionary mapping numbers 0-51 to a card image
+    Takes a card out of the pool and places it face up
+
+        Parameters:
+            num(int) - the card (0-51)
+            x(int) - the x coordinate of the left side of the card
+            y(int) - the y coordinate of the top of the card
 
         Returns:
-            The dictionary
+            (Card) - the card's sprite
 
     """
-    images = {}
-    suits = ['c','d','h','s']
-
-    i = 0
-    for num in range(13):
-      char = str(num+1)
-      for suit in suits:
-        images[i] = (char + suit + ".gif")
-        i += 1
+    if self._cards is None:
+      self._cards = [Card(0, 0, card) for card in range(52)]
+    if self._out[num]:
+      raise RuntimeError("the card is already out of the pool")
+
+    card = self._cards[num]
+    card.updatePos(x, y)
+    card.setFaceUp(True)
+    self._out[num] = True
+    return card
+
+  def checkIn(self, card):
+    """
+    Puts a card back in the pool, taking it out of its sprite groups
 
-    return images
+        Parameters:
+            card(Card) - a card taken out with checkOut
 
-  
\ No newline at end of file
+    """
+    card.kill()
+    self._out[card.getNumber()] = False
+
+  def checkInAll(self):
+    """ Puts every card back in the pool """
+    for num, out in enumerate(self._out):
+      if out:
+        self.checkIn(self._cards[num])
+
+def cardImage(num):
+  """
+  Gets the image of a card from the atlas, loading the atlas the first
+  time an image is needed
+
+  The display must be set up before the first image is needed.
+
+      Parameters:
+          num(int) - the card (0-51), or BACK for the back of a card
+
+      Returns:
+          (Surface) - the image, a subsurface shared by every card showing
+                      it
+
+  """
+  global _images
+  if _images is None:
+    _images = _loadAtlas()
+  return _images[num]
+
+def _loadAtlas():
+  """
+  Loads the 52 faces and the back into one surface, each suit in a row
+  and the back below them
+
+      Returns:
+          (list of Surfaces) - the image of each card, then the back
+
+  """
+  suits = ['c','d','h','s']
+  files = ["%d%s.gif" % (num // 4 + 1, suits[num % 4]) for num in range(52)]
+  files.append("b.gif")
+
+  loaded = [pygame.image.load(os.path.join(DECK_PATH, file))
+            for file in files]
+  width, height = loaded[0].get_size()
+  atlas = pygame.Surface((13 * width, 5 * height)).convert()
+  images = []
+  for num, image in enumerate(loaded):
+    rect = pygame.Rect((num // 4) * width, (num % 4) * height, width, height)
+    if num == BACK:
+      rect.topleft = (0, 4 * height)
+
+    # Copy the transparent corners as they are and keep them transparent
+    image = image.convert()
+    colorkey = image.get_colorkey()
+    image.set_colorkey(None)
+    atlas.blit(image, rect)
+    subsurface = atlas.subsurface(rect)
+    subsurface.set_colorkey(colorkey)
+    images.append(subsurface)
+  return images
+
+# The number of the back of a card in cardImage
+BACK = 52
+
+# The folder of the card images
+DECK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         os.pardir, "DECK")
+
+_images = None
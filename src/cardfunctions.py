@@ -2,9 +2,12 @@
 # Author : Christian Garcia
 # Project: Card functions
 #
-from math import ceil
-from random import randint
+from numbers import Integral
 from deck import Deck
+from handcache import HandCache, canonicalKey
+from handtables import loadTables, HIGH_CARD, PAIR, TWO_PAIRS, \
+  THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, \
+  STRAIGHT_FLUSH, CATEGORY_SHIFT, RANK_KEYS, RANK_BUCKETS, RANK_SLOTS
 
 def main():
   """ Tests the functions with two sets of 7 cards """
@@ -44,10 +47,10 @@ def main():
   aiCards += middleCards
 
   # Check for the best hand value
-  userValue = checkHand(userCards)
-  print("You got:", userValue)
-  aiValue = checkHand(aiCards)
-  print("The computer got:", aiValue)
+  userValue = handStrength(userCards)
+  print("You got:", handName(userValue))
+  aiValue = handStrength(aiCards)
+  print("The computer got:", handName(aiValue))
 
   # Compare the hand values
   winner = compareHands(userValue, aiValue)
@@ -65,6 +68,12 @@ def checkHand(hand):
   """
   Checks a hand and returns the highest hand value
 
+  The cache (see handCache) is off by default, since working out the
+  canonical key of a hand costs more than scoring it. Once it is given a
+  size, strengths are remembered by the canonical key of the hand, so a
+  hand that only differs by the order of its cards or a change of suits
+  is not scored again.
+
       Parameters:
           hand(list of cards) - the player's hand
 
@@ -72,18 +81,257 @@ def checkHand(hand):
           (str) - the highest hand value
 
   """
-  if royalFlush(hand): return "Royal Flush"
-  if straightFlush(hand): return "Straight Flush"
-  if fourOfAKind(hand): return "Four of a Kind"
-  if fullHouse(hand): return "Full House"
-  if flush(hand): return "Flush"
-  if straight(hand): return "Straight"
-  if threeOfAKind(hand): return "Three of a Kind"
-  if twoPairs(hand): return "Two Pairs"
-  if pair(hand): return "Pair"
+  if _handCache.getMaxSize() == 0:
+    return handName(handStrength(hand))
+  key = canonicalKey(hand)
+  strength = _handCache.get(key)
+  if strength is None:
+    strength = handStrength(hand)
+    _handCache.put(key, strength)
+  return handName(strength)
+
+def handCache():
+  """
+  Gets the cache used by checkHand, to read its counters or change its
+  size; it keeps nothing until it is given a size
+
+      Returns:
+          (HandCache) - the cache of hand strengths
+
+  """
+  return _handCache
+
+def handStrength(hand):
+  """
+  Scores a hand of up to 7 cards with a few table lookups
+
+      Parameters:
+          hand(list of cards) - the player's hand
+
+      Returns:
+          (int) - the strength of the best hand, a bigger number is a
+                  better hand and kickers are included
+
+  """
+  key = 0
+  for card in hand:
+    key += _CARD_KEYS[card]
+
+  suit = _FLUSH_SUITS[key & _SUIT_FIELD]
+  if suit < 0:
+    key >>= _SUIT_BITS
+    return _RANKS[(key + _DISPLACEMENTS[key % RANK_BUCKETS]) % RANK_SLOTS]
+
+  # Only the cards of the flush suit matter once there is a flush
+  mask = 0
+  for card in hand:
+    if card % 4 == suit:
+      mask |= _CARD_BITS[card]
+  return _FLUSHES[mask]
+
+def showdownStrengths(holes, board):
+  """
+  Scores the hands of every player at a showdown in one call, adding
+  the board to the hand keys only once
+
+      Parameters:
+          holes(list of hands) - the hole cards of each player
+          board(list of cards) - the middle cards
+
+      Returns:
+          (list of int) - the strength of each player's best hand, as
+                          returned by handStrength
+
+  """
+  boardKey = 0
+  boardMasks = [0, 0, 0, 0]
+  for card in board:
+    boardKey += _CARD_KEYS[card]
+    boardMasks[card % 4] |= _CARD_BITS[card]
+
+  strengths = []
+  for hole in holes:
+    key = boardKey
+    for card in hole:
+      key += _CARD_KEYS[card]
+
+    suit = _FLUSH_SUITS[key & _SUIT_FIELD]
+    if suit < 0:
+      key >>= _SUIT_BITS
+      strengths.append(
+        _RANKS[(key + _DISPLACEMENTS[key % RANK_BUCKETS]) % RANK_SLOTS])
+    else:
+      mask = boardMasks[suit]
+      for card in hole:
+        if card % 4 == suit:
+          mask |= _CARD_BITS[card]
+      strengths.append(_FLUSHES[mask])
+  return strengths
+
+def cardKey(card):
+  """
+  Gets the amount a card adds to the key of a hand
+
+      Parameters:
+          card(int) - the card (0-51)
+
+      Returns:
+          (int) - the card's key, the key of a hand is the sum of the
+                  keys of its cards
+
+  """
+  return _CARD_KEYS[card]
+
+def cardBit(card):
+  """
+  Gets the bit of a card's rank in a rank mask, the Ace being the highest
+
+      Parameters:
+          card(int) - the card (0-51)
+
+      Returns:
+          (int) - the bit of the card's rank
+
+  """
+  return _CARD_BITS[card]
+
+def keyStrength(key, suitMasks):
+  """
+  Scores a hand from its key without looking at its cards
+
+      Parameters:
+          key(int) - the sum of the cardKey of every card in the hand
+          suitMasks(list of int) - the rank mask of the cards of each suit
+
+      Returns:
+          (int) - the strength of the best hand, as returned by handStrength
+
+  """
+  suit = _FLUSH_SUITS[key & _SUIT_FIELD]
+  if suit < 0:
+    key >>= _SUIT_BITS
+    return _RANKS[(key + _DISPLACEMENTS[key % RANK_BUCKETS]) % RANK_SLOTS]
+  return _FLUSHES[suitMasks[suit]]
+
+def rankKey(card):
+  """
+  Gets the amount a card's rank adds to the key of a hand, leaving out
+  its suit
+
+      Parameters:
+          card(int) - the card (0-51)
+
+      Returns:
+          (int) - the key of the card's rank
+
+  """
+  return _CARD_KEYS[card] & ~_SUIT_FIELD
+
+def rankStrength(key):
+  """
+  Scores a hand from the sum of its rankKey values, ignoring flushes
+
+      Parameters:
+          key(int) - the sum of the rankKey of every card in the hand
+
+      Returns:
+          (int) - the strength of the best hand that is not a flush
+
+  """
+  key >>= _SUIT_BITS
+  return _RANKS[(key + _DISPLACEMENTS[key % RANK_BUCKETS]) % RANK_SLOTS]
+
+def flushStrength(mask):
+  """
+  Scores the cards of one suit
+
+      Parameters:
+          mask(int) - the rank mask (see cardBit) of the cards of the suit
+
+      Returns:
+          (int) - the strength of the flush or straight flush, or 0 if
+                  there are fewer than 5 cards
+
+  """
+  return _FLUSHES[mask]
+
+def bestHand(hand):
+  """
+  Scores a hand and finds the five cards that make its strength
+
+      Parameters:
+          hand(list of cards) - the player's hand
+
+      Returns:
+          (tuple) - the strength of the best hand and the list of cards
+                    making it, most important cards first
+
+  """
+  strength = handStrength(hand)
+  category = strength >> CATEGORY_SHIFT
+
+  # Read back the deciding ranks from the strength
+  ranks = []
+  shift = CATEGORY_SHIFT - 4
+  while shift >= 0 and (strength >> shift) & 15:
+    ranks.append(((strength >> shift) & 15) - 1)
+    shift -= 4
+  if category == STRAIGHT or category == STRAIGHT_FLUSH:
+    ranks = [(ranks[0] - i) % 13 for i in range(5)]
+
+  # A flush can only be made from the cards of its suit
+  suit = -1
+  if category == FLUSH or category == STRAIGHT_FLUSH:
+    suitCounts = [0, 0, 0, 0]
+    for card in hand:
+      suitCounts[card % 4] += 1
+    suit = suitCounts.index(max(suitCounts))
+
+  cards = []
+  for rank, count in zip(ranks, _CATEGORY_COUNTS[category]):
+    for card in hand:
+      if (card // 4 - 1) % 13 == rank and (suit < 0 or card % 4 == suit):
+        cards.append(card)
+        count -= 1
+        if count == 0:
+          break
+
+  return strength, cards
+
+def handCategory(strength):
+  """
+  Gets the category of a hand strength
+
+      Parameters:
+          strength(int) - a strength returned by handStrength
+
+      Returns:
+          (int) - one of HIGH_CARD, PAIR, ... STRAIGHT_FLUSH
+
+  """
+  return strength >> CATEGORY_SHIFT
+
+def handName(strength):
+  """
+  Gets the name of a hand strength, as returned by checkHand
+
+      Parameters:
+          strength(int) - a strength returned by handStrength
+
+      Returns:
+          (str) - the name of the hand value
+
+  """
+  category = strength >> CATEGORY_SHIFT
+  highest = (strength >> (CATEGORY_SHIFT - 4)) & 15
+
+  if category == HIGH_CARD:
+    return _RANK_NAMES[highest - 1]
+  if category == STRAIGHT_FLUSH and highest == 13:
+    return "Royal Flush"
+
+  return _CATEGORY_NAMES[category]
 
-  return highcard(hand)
-  
 def royalFlush(hand):
   """
   Checks if the hand contains a royal flush
@@ -341,27 +589,69 @@ def highcard(hand):
 
 def compareHands(hand1, hand2):
   """
-  Compares two hand values to see which is better
+  Compares two hand strengths to see which is better
 
       Parameters:
-          hand1(list of cards) - the first hand
-          hand2(list of cards) - the second hand
+          hand1(int) - the strength of the first hand
+          hand2(int) - the strength of the second hand
 
       Returns:
           (int) - 0: draw, 1: hand1 wins, 2: hand2 wins
 
   """
-  ranking = ['2','3','4','5','6','7','8','9','10','Jack','Queen',
-  'King','Ace','Pair','Two Pairs','Three of a Kind','Straight',
-  'Flush','Full House','Four of a Kind','Straight Flush','Royal Flush']
-
-  if ranking.index(hand1) > ranking.index(hand2):
+  # Names, as checkHand returns, would compare in alphabetical order
+  if not isinstance(hand1, Integral) or not isinstance(hand2, Integral):
+    raise TypeError("compareHands compares strengths from handStrength, "
+                    "not hand names")
+  if hand1 > hand2:
     return 1
-  elif ranking.index(hand1) < ranking.index(hand2):
+  elif hand1 < hand2:
     return 2
   else:
     return 0
 
+def _buildTables():
+  """ Builds the small lookup tables used by handStrength """
+  for card in range(52):
+    rank = (card // 4 - 1) % 13
+    suit = card % 4
+    _CARD_KEYS.append((RANK_KEYS[rank] << _SUIT_BITS) | (1 << (3 * suit)))
+    _CARD_BITS.append(1 << rank)
+
+  # Suit counts are packed 3 bits per suit
+  for suitKey in range(1 << _SUIT_BITS):
+    flushSuit = -1
+    for suit in range(4):
+      if (suitKey >> (3 * suit)) & 7 >= 5:
+        flushSuit = suit
+    _FLUSH_SUITS.append(flushSuit)
+
+_CATEGORY_NAMES = ['High Card', 'Pair', 'Two Pairs', 'Three of a Kind',
+                   'Straight', 'Flush', 'Full House', 'Four of a Kind',
+                   'Straight Flush']
+_RANK_NAMES = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen',
+               'King', 'Ace']
+
+# The number of cards used from each deciding rank of a category
+_CATEGORY_COUNTS = [(1, 1, 1, 1, 1), (2, 1, 1, 1), (2, 2, 1), (3, 1, 1),
+                    (1, 1, 1, 1, 1), (1, 1, 1, 1, 1), (3, 2), (4, 1),
+                    (1, 1, 1, 1, 1)]
+
+# Every card adds its rank key and a count for its suit to the hand key
+_SUIT_BITS = 12
+_SUIT_FIELD = (1 << _SUIT_BITS) - 1
+
+_CARD_KEYS = []
+_CARD_BITS = []
+_FLUSH_SUITS = []
+_buildTables()
+
+# The big tables are shared from a memory-mapped file
+_FLUSHES, _DISPLACEMENTS, _RANKS = loadTables()
+
+# Off until it is given a size, see checkHand
+_handCache = HandCache(0)
+
 if __name__ == "__main__":
   main()
 
@@ -0,0 +1,185 @@
+##
+# Author : Christian Garcia
+# Project: Census of every seven-card hand
+#
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, islice
+from math import comb
+from multiprocessing import shared_memory
+from cardfunctions import handStrength, handCategory, handName, \
+  STRAIGHT_FLUSH
+
+def main():
+  """ Counts every seven-card hand and checks the counts """
+  start = time.time()
+  counts = census()
+  seconds = time.time() - start
+
+  wrong = False
+  for name, count, expected in zip(NAMES, counts, EXPECTED_COUNTS):
+    mark = ""
+    if count != expected:
+      mark = "  WRONG, expected %d" % expected
+      wrong = True
+    print("%-16s %12d%s" % (name, count, mark))
+  print("Scored %d hands in %.1f seconds, %.0f hands/s" %
+        (sum(counts), seconds, sum(counts) / seconds))
+  if wrong:
+    sys.exit(1)
+
+def census(workers=None, ranges=None, batch=False):
+  """
+  Scores every seven-card hand and counts the hands of each category
+
+  The hands are numbered in the order itertools.combinations lists them
+  and split into ranges of numbers that are shared out to a pool of
+  processes. Each range adds its counts to its own row of a shared
+  memory array, so no counts are sent back through the pool.
+
+      Parameters:
+          workers(int) - the number of processes, all cores by default
+          ranges(int) - the number of ranges, 16 for each process by
+                        default
+          batch(bool) - True to score the hands with the NumPy evaluator
+                        in batchfunctions instead of handStrength
+
+      Returns:
+          (list of int) - the number of hands of each category, in the
+                          order of NAMES
+
+  """
+  if workers is None:
+    workers = os.cpu_count() or 1
+  if ranges is None:
+    ranges = 16 * workers
+
+  total = comb(52, 7)
+  bounds = [total * i // ranges for i in range(ranges + 1)]
+  columns = len(NAMES)
+  memory = shared_memory.SharedMemory(create=True, size=8 * ranges * columns)
+  try:
+    rows = memory.buf.cast('q')
+    rows[:] = array('q', bytes(8 * ranges * columns))
+    rows.release()
+
+    with ProcessPoolExecutor(workers) as executor:
+      jobs = [executor.submit(_countRange, memory.name, row, bounds[row],
+                              bounds[row + 1], batch)
+              for row in range(ranges)]
+      for job in jobs:
+        job.result()
+
+    rows = memory.buf.cast('q')
+    counts = [sum(rows[row * columns + column] for row in range(ranges))
+              for column in range(columns)]
+    rows.release()
+  finally:
+    memory.close()
+    memory.unlink()
+
+  return counts
+
+def _countRange(name, row, start, stop, batch):
+  """
+  Scores the hands numbered start up to stop and stores their counts
+
+      Parameters:
+          name(str) - the name of the shared memory holding the counts
+          row(int) - the row of counts that belongs to this range
+          start(int) - the number of the first hand
+          stop(int) - the number after the last hand
+          batch(bool) - True to score with the NumPy evaluator
+
+  """
+  if batch:
+    strengths = _batchStrengths(start, stop)
+  else:
+    strengths = Counter(map(handStrength, _hands(start, stop)))
+
+  # Only a few thousand strengths are different, so sort them out last
+  counts = [0] * len(NAMES)
+  for strength, count in strengths.items():
+    if handName(strength) == "Royal Flush":
+      counts[ROYAL_FLUSH] += count
+    else:
+      counts[handCategory(strength)] += count
+
+  memory = shared_memory.SharedMemory(name=name)
+  rows = memory.buf.cast('q')
+  columns = len(NAMES)
+  rows[row * columns:(row + 1) * columns] = array('q', counts)
+  rows.release()
+  memory.close()
+
+def _batchStrengths(start, stop):
+  """
+  Scores the hands numbered start up to stop in NumPy batches
+
+      Parameters:
+          start(int) - the number of the first hand
+          stop(int) - the number after the last hand
+
+      Returns:
+          (Counter) - the number of hands with each strength
+
+  """
+  import numpy as np
+  from batchfunctions import handStrengths
+
+  strengths = Counter()
+  hands = _hands(start, stop)
+  while True:
+    chunk = list(islice(hands, _BATCH_SIZE))
+    if not chunk:
+      return strengths
+    values, counts = np.unique(handStrengths(np.array(chunk, dtype=np.int8)),
+                               return_counts=True)
+    strengths.update(dict(zip(values.tolist(), counts.tolist())))
+
+def _hands(start, stop):
+  """
+  Lists the hands numbered start up to stop
+
+  Hands that share their first two cards come one after the other, so
+  each pair of first cards is a block that itertools can list quickly.
+
+      Parameters:
+          start(int) - the number of the first hand
+          stop(int) - the number after the last hand
+
+      Returns:
+          (generator) - the hands as tuples of seven cards
+
+  """
+  number = 0
+  for first in range(52):
+    for second in range(first + 1, 52):
+      size = comb(51 - second, 5)
+      if number + size > start and number < stop:
+        rest = combinations(range(second + 1, 52), 5)
+        rest = islice(rest, max(start - number, 0),
+                      min(stop - number, size))
+        yield from map((first, second).__add__, rest)
+      number += size
+      if number >= stop:
+        return
+
+NAMES = ['High Card', 'Pair', 'Two Pairs', 'Three of a Kind', 'Straight',
+         'Flush', 'Full House', 'Four of a Kind', 'Straight Flush',
+         'Royal Flush']
+# Straight flushes are counted without the royal flushes
+ROYAL_FLUSH = STRAIGHT_FLUSH + 1
+
+# The number of seven-card hands of each category
+EXPECTED_COUNTS = [23294460, 58627800, 31433400, 6461620, 6180020, 4047644,
+                   3473184, 224848, 37260, 4324]
+
+_BATCH_SIZE = 1 << 16
+
+if __name__ == "__main__":
+  main()
@@ -1,20 +1,54 @@
-## 
+##
 # Author : Christian Garcia
 # Project: Deck class for poker game
 #
-from random import shuffle
+from random import random
 
 class Deck:
   """ Object to represent a deck of playing cards """
-  def __init__(self):
-    """ Initializes variables for the Deck """
-    self._cards = []
-    for i in range(52):
-      self._cards.append(i)
+  def __init__(self, seed=None):
+    """
+    Initializes variables for the Deck
+
+        Parameters:
+            seed(int, SeedSequence or Generator) - seeds a NumPy random
+                generator of the deck's own, so its shuffles and deals can
+                be replayed; a SeedSequence is turned into a number first
+                so it can be logged, and the deck uses the random module
+                when None
+
+    """
+    self._cards = list(range(52))
+    # Cards before _next have been drawn, cards from _size on are removed
+    self._next = 0
+    self._size = 52
+    # The cards are only put in random places as they are drawn
+    self._shuffled = False
+    self._randoms = None
+    self._generator = None
+    if seed is not None:
+      import numpy as np
+      if isinstance(seed, np.random.SeedSequence):
+        seed = int(seed.generate_state(1, np.uint64)[0])
+      self._generator = np.random.default_rng(seed)
+    self._seed = seed if isinstance(seed, int) else None
 
   def shuffle(self):
-    """ Shuffles the cards """
-    shuffle(self._cards)
+    """ Puts the drawn cards back and shuffles the cards """
+    # Start from the same order every time, so a shuffle depends only on
+    # its own random numbers and not on what earlier hands drew
+    self._cards[:self._size] = sorted(self._cards[:self._size])
+    self._next = 0
+    self._shuffled = True
+    if self._generator is not None:
+      self._randoms = self._generator.random(self._size).tolist()
+
+  def reset(self):
+    """ Puts every drawn and removed card back, in order """
+    self._next = 0
+    self._size = 52
+    self._cards = list(range(52))
+    self._shuffled = False
 
   def draw(self, amount):
     """
@@ -27,17 +61,137 @@ class Deck:
             A list of integers representing the cards' values
 
     """
-    # Check if the user is trying to draw too many cards than exist
-    if amount > len(self._cards):
-      raise RuntimeError("cannot draw more cards than in existence")
-    
-    # Create an empty list of cards
-    cards = []
+    # Check if the user is trying to draw more cards than are left
+    if amount > self._size - self._next:
+      raise RuntimeError("cannot draw more cards than are left in the deck")
+
+    start = self._next
+    self._next += amount
+    cards = self._cards
+    if self._shuffled:
+      # Swap a random card left into each place drawn, so only the cards
+      # that are drawn are shuffled
+      randoms = self._randoms
+      for position in range(start, self._next):
+        if randoms is None:
+          other = position + int(random() * (self._size - position))
+        else:
+          other = position + int(randoms[position] * (self._size - position))
+        cards[position], cards[other] = cards[other], cards[position]
+    return cards[start:self._next]
+
+  def remove(self, deadCards):
+    """
+    Takes cards that are known to be out of play out of the deck
+
+        Parameters:
+            deadCards(list of cards) - the cards being removed, they must
+                                       not have been drawn or removed
+
+    """
+    for card in deadCards:
+      position = self._cards.index(card)
+      if position < self._next or position >= self._size:
+        raise RuntimeError("cannot remove a card that is not in the deck")
+
+      # Swap the card with the last card left so the rest stay together
+      self._size -= 1
+      self._cards[position] = self._cards[self._size]
+      self._cards[self._size] = card
+
+  def cardsLeft(self):
+    """
+    Gets the number of cards that can still be drawn
+
+        Returns:
+            (int) - the number of cards left
+
+    """
+    return self._size - self._next
+
+  def getSeed(self):
+    """
+    Gets the number the deck was seeded with
+
+        Returns:
+            (int) - the seed, or None if the deck was not seeded with a
+                    number or a SeedSequence; with the number of shuffles
+                    it deals any hand again
+
+    """
+    return self._seed
+
+  def spawn(self, count):
+    """
+    Makes new decks with random streams that are independent of this
+    deck's and of each other, for example one for each worker process
+
+        Parameters:
+            count(int) - the number of decks
+
+        Returns:
+            (list of Decks) - the new decks, full and in order
+
+    """
+    sequence = self._getGenerator().bit_generator.seed_seq
+    return [Deck(child) for child in sequence.spawn(count)]
+
+  def permutations(self, count):
+    """
+    Shuffles the cards left in the deck many times at once, without
+    drawing them
+
+        Parameters:
+            count(int) - the number of shuffles
+
+        Returns:
+            (numpy array) - one shuffle of the cards left in each row
+
+    """
+    import numpy as np
+
+    # Sorting random keys shuffles every row on its own
+    left = np.array(self._cards[self._next:self._size], dtype=np.int8)
+    keys = self._getGenerator().random((count, len(left)))
+    return left[np.argsort(keys, axis=1)]
+
+  def dealMany(self, deals, cardsPerDeal):
+    """
+    Deals many independent deals at once from the cards left in the
+    deck, without drawing them
+
+    Every deal is made from its own shuffle of the cards left, so a card
+    can be in many deals but only once in each deal.
+
+        Parameters:
+            deals(int) - the number of deals
+            cardsPerDeal(int) - the number of cards in each deal
+
+        Returns:
+            (numpy array) - the deals, one row of cards for each deal
+
+    """
+    if cardsPerDeal > self._size - self._next:
+      raise RuntimeError("cannot draw more cards than are left in the deck")
+    return self.permutations(deals)[:, :cardsPerDeal]
+
+  def _getGenerator(self):
+    """
+    Gets the NumPy random generator of the deck, an unseeded one shared
+    by all unseeded decks if it was not given a seed
+
+        Returns:
+            (Generator) - the random generator
+
+    """
+    if self._generator is not None:
+      return self._generator
 
-    # Add the given amount of cards to the list
-    for i in range(amount):
-      card = self._cards.pop(0)
-      cards.append(card)
-      self._cards.append(card)
+    global _generator
+    if _generator is None:
+      import numpy as np
+      _generator = np.random.default_rng()
+    return _generator
 
-    return cards
\ No newline at end of file
+# The random numbers of unseeded decks, made when first needed
+_generator = None
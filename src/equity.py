@@ -0,0 +1,204 @@
+##
+# Author : Christian Garcia
+# Project: Equity functions
+#
+from itertools import combinations
+from math import comb
+from cardfunctions import cardBit, rankKey, rankStrength, flushStrength
+from preflop import preflopCounts
+
+def main():
+  """ Prints the equity of a few well known preflop match ups """
+  matchUps = [
+    ([0, 1], [48, 49], "AcAd vs KcKd"),
+    ([3, 51], [34, 38], "AsKs vs 10h9h"),
+    ([0, 46], [5, 10], "AcQh vs 2d3h"),
+  ]
+  for holeA, holeB, name in matchUps:
+    win, tie, loss = equity(holeA, holeB)
+    print("%s: win %.2f%%, tie %.2f%%, loss %.2f%%" %
+          (name, 100 * win, 100 * tie, 100 * loss))
+
+def equity(holeA, holeB, board=(), dead=()):
+  """
+  Works out exactly how often one hand beats another over every way the
+  rest of the board can be dealt
+
+      Parameters:
+          holeA(list of cards) - the first player's two hole cards
+          holeB(list of cards) - the second player's two hole cards
+          board(list of cards) - the middle cards dealt so far (0-5)
+          dead(list of cards) - cards that are known to be out of the deck
+
+      Returns:
+          (tuple) - the fractions of runouts that the first hand wins,
+                    ties and loses
+
+  """
+  counts = None
+  if not board and not dead:
+    counts = preflopCounts(holeA, holeB)
+  if counts is None:
+    counts, total = equityCounts(holeA, holeB, board, dead)
+  else:
+    total = sum(counts)
+  return counts[0] / total, counts[1] / total, counts[2] / total
+
+def equityCounts(holeA, holeB, board=(), dead=()):
+  """
+  Counts the runouts the first hand wins, ties and loses
+
+  The runouts are first counted by their ranks only, as if no flush could
+  be made, since every runout with the same ranks plays the same without
+  a flush. The runouts that do give a player a flush are then counted
+  again one suit at a time and the difference is corrected.
+
+      Parameters:
+          holeA(list of cards) - the first player's two hole cards
+          holeB(list of cards) - the second player's two hole cards
+          board(list of cards) - the middle cards dealt so far (0-5)
+          dead(list of cards) - cards that are known to be out of the deck
+
+      Returns:
+          (tuple) - the list of wins, ties and losses, and the total
+                    number of runouts
+
+  """
+  holeA = list(holeA)
+  holeB = list(holeB)
+  board = list(board)
+  known = holeA + holeB + board + list(dead)
+  if len(holeA) != 2 or len(holeB) != 2:
+    raise RuntimeError("each player must have two hole cards")
+  if len(board) > 5:
+    raise RuntimeError("the board cannot have more than 5 cards")
+  if len(set(known)) != len(known):
+    raise RuntimeError("a card cannot be dealt twice")
+
+  remaining = [card for card in range(52) if card not in known]
+  left = 5 - len(board)
+  total = comb(len(remaining), left)
+  counts = [0, 0, 0]
+
+  # Group the cards left in the deck by rank
+  available = [0] * 13
+  keys = [0] * 13
+  for card in remaining:
+    rank = cardBit(card).bit_length() - 1
+    available[rank] += 1
+    keys[rank] = rankKey(card)
+
+  baseA = sum(rankKey(card) for card in holeA + board)
+  baseB = sum(rankKey(card) for card in holeB + board)
+
+  # Count every runout as if it could not make a flush
+  for key, weight in _rankRunouts(available, keys, left):
+    _tally(counts, rankStrength(baseA + key), rankStrength(baseB + key),
+           weight)
+
+  # A runout can only complete a flush for one suit, so the suits can be
+  # corrected one at a time
+  for suit in range(4):
+    suitedA = [card for card in holeA + board if card % 4 == suit]
+    suitedB = [card for card in holeB + board if card % 4 == suit]
+    need = 5 - max(len(suitedA), len(suitedB))
+    suited = [card for card in remaining if card % 4 == suit]
+    if need > min(left, len(suited)):
+      continue
+
+    maskA = sum(cardBit(card) for card in suitedA)
+    maskB = sum(cardBit(card) for card in suitedB)
+    others = list(available)
+    for card in suited:
+      others[cardBit(card).bit_length() - 1] -= 1
+
+    for amount in range(max(need, 0), min(left, len(suited)) + 1):
+      otherRunouts = _rankRunouts(others, keys, left - amount)
+
+      for cards in combinations(suited, amount):
+        mask = 0
+        key = 0
+        for card in cards:
+          mask |= cardBit(card)
+          key += rankKey(card)
+
+        # A flush in 7 cards is always the best hand that can be made
+        flushA = 0
+        if len(suitedA) + amount >= 5:
+          flushA = flushStrength(maskA | mask)
+        flushB = 0
+        if len(suitedB) + amount >= 5:
+          flushB = flushStrength(maskB | mask)
+
+        for otherKey, weight in otherRunouts:
+          strengthA = rankStrength(baseA + key + otherKey)
+          strengthB = rankStrength(baseB + key + otherKey)
+          _tally(counts, strengthA, strengthB, -weight)
+          _tally(counts, flushA or strengthA, flushB or strengthB, weight)
+
+  return counts, total
+
+def _rankRunouts(available, keys, amount):
+  """
+  Lists every set of ranks that can be dealt and how many ways each
+  can be dealt
+
+      Parameters:
+          available(list of int) - the number of cards left of each rank
+          keys(list of int) - the rankKey of each rank
+          amount(int) - the number of cards being dealt
+
+      Returns:
+          (list of tuples) - the key of each set of ranks and the number
+                             of runouts that have those ranks
+
+  """
+  runouts = []
+  _addRankRunouts(runouts, available, keys, 0, amount, 0, 1)
+  return runouts
+
+def _addRankRunouts(runouts, available, keys, rank, amount, key, weight):
+  """
+  Adds the sets of ranks that start with the ranks chosen so far
+
+      Parameters:
+          runouts(list of tuples) - the list being filled
+          available(list of int) - the number of cards left of each rank
+          keys(list of int) - the rankKey of each rank
+          rank(int) - the next rank to choose a count for
+          amount(int) - the number of cards still to be dealt
+          key(int) - the key of the ranks chosen so far
+          weight(int) - the number of ways to deal the ranks chosen so far
+
+  """
+  if amount == 0:
+    runouts.append((key, weight))
+    return
+  if rank == 13:
+    return
+
+  for count in range(min(amount, available[rank]) + 1):
+    _addRankRunouts(runouts, available, keys, rank + 1, amount - count,
+                    key + count * keys[rank],
+                    weight * comb(available[rank], count))
+
+def _tally(counts, strengthA, strengthB, weight):
+  """
+  Adds the weight of a runout to the win, tie or loss count
+
+      Parameters:
+          counts(list of int) - the wins, ties and losses of the first hand
+          strengthA(int) - the strength of the first hand
+          strengthB(int) - the strength of the second hand
+          weight(int) - the number of runouts being added
+
+  """
+  if strengthA > strengthB:
+    counts[0] += weight
+  elif strengthA == strengthB:
+    counts[1] += weight
+  else:
+    counts[2] += weight
+
+if __name__ == "__main__":
+  main()
@@ -3,16 +3,23 @@
 # Project: GameBase class for poker game
 #
 import pygame
+from jobs import JobRunner, JOB_DONE
+
+# Background color
+WHITE = (255, 255, 255)
 
 class GameBase:
   """ Class to manage a group of sprites """
-  def __init__(self, width, height):
+  def __init__(self, width, height, dirtyRendering=False):
     """
     Initialize variables for the game
 
         Parameters:
             width(int) - the width of the display
             height(int) - the height of the display
+            dirtyRendering(bool) - True to draw only what changed each
+                                   frame, the sprites must then be
+                                   DirtySprites
 
     """
     pygame.init()
@@ -21,9 +28,20 @@ class GameBase:
     self._display = pygame.display.set_mode((self._width, self._height))
     self._clock = pygame.time.Clock()
     self._framesPerSecond = 30
-    self._sprites = pygame.sprite.LayeredUpdates()
+    self._dirtyRendering = dirtyRendering
+    if dirtyRendering:
+      self._sprites = pygame.sprite.LayeredDirty()
+      # Never fall back to drawing the whole display when a frame is slow
+      self._sprites.set_timing_threshold(float("inf"))
+    else:
+      self._sprites = pygame.sprite.LayeredUpdates()
+    self._background = pygame.Surface((width, height)).convert()
+    self._background.fill(WHITE)
+    self._dirtyRects = []
+    self._redrawAll = True
     self._ticks = 0
     self._done = False
+    self._jobs = JobRunner()
 
   def mouseButtonDown(self, x, y):
     """ 
@@ -46,13 +64,53 @@ class GameBase:
     """
     return
 
+  def jobDone(self, tag, result, error=None):
+    """ 
+    Performs the following code when a job started with submitJob
+    finishes
+
+        Parameters:
+            tag(str) - the tag the job was started with
+            result - the value the job returned, None if it failed
+            error(Exception) - the error the job raised, None if it
+                               succeeded
+
+    """
+    return
+
+  def submitJob(self, tag, function, *args):
+    """
+    Runs a function on a worker thread so the game keeps drawing, the
+    result is handed to jobDone from the game loop
+
+        Parameters:
+            tag(str) - names the job for jobDone
+            function(function) - the work to do
+            args - the arguments of the function
+
+        Returns:
+            (Future) - the future of the job
+
+    """
+    return self._jobs.submit(tag, function, *args)
+
   def update(self):
     """ Updates this object's sprites """
     self._sprites.update()
 
   def draw(self):
-    """ Draws this object's sprites """
-    self._sprites.draw(self._display)
+    """
+    Draws this object's sprites, only the ones that changed when drawing
+    only what changed
+    """
+    if self._dirtyRendering:
+      self._dirtyRects += self._sprites.draw(self._display, self._background)
+    else:
+      self._sprites.draw(self._display)
+
+  def redrawAll(self):
+    """ Draws the whole display again on the next frame """
+    self._redrawAll = True
 
   def add(self, sprite):
     """
@@ -62,6 +120,8 @@ class GameBase:
             sprite - a sprite object
 
     """
+    if self._dirtyRendering:
+      sprite.dirty = 1
     self._sprites.add(sprite)
 
   def getTicks(self):
@@ -74,9 +134,13 @@ class GameBase:
     return self._ticks
 
   def reset(self):
-    """ Resets sprites and ticks """
-    self._sprites = pygame.sprite.LayeredUpdates()
+    """
+    Takes every sprite out of the game, keeping the sprite group, resets
+    the ticks and cancels the running jobs
+    """
+    self._sprites.empty()
     self._ticks = 0
+    self._jobs.cancelAll()
 
   def quit(self):
     """ Tells the object to finish the 'run' loop """
@@ -93,13 +157,27 @@ class GameBase:
           self.mouseButtonDown(event.pos[0], event.pos[1])
         elif event.type == pygame.KEYDOWN:
           self.keyDown(event.key)
+        elif event.type == JOB_DONE and self._jobs.isCurrent(event):
+          # A failed job is handed on like any other so the game goes on
+          self.jobDone(event.tag, event.result, event.error)
+        elif event.type == pygame.WINDOWEXPOSED:
+          self.redrawAll()
       self.update()
-      # Set background color
-      WHITE = (255, 255, 255)
-      self._display.fill(WHITE)
-      # Draw the sprites
-      self.draw()
-      # Update the display
-      pygame.display.update()
+      if self._dirtyRendering:
+        # Draw the parts of the display that changed and show only them
+        self._dirtyRects = []
+        if self._redrawAll:
+          self._sprites.repaint_rect(self._display.get_rect())
+        self.draw()
+        self._redrawAll = False
+        pygame.display.update(self._dirtyRects)
+      else:
+        # Set background color
+        self._display.blit(self._background, (0, 0))
+        # Draw the sprites
+        self.draw()
+        # Update the display
+        pygame.display.update()
       self._clock.tick(self._framesPerSecond)
       self._ticks += 1
+    self._jobs.shutdown()
@@ -0,0 +1,168 @@
+##
+# Author : Christian Garcia
+# Project: HandCache class for poker game
+#
+from collections import OrderedDict
+
+def canonicalKey(hand):
+  """
+  Packs a hand into a 64-bit key that is the same for every order of its
+  cards and every change of suits
+
+  Each suit is turned into a 13-bit mask of its ranks, which already
+  forgets the order of the cards. The masks are then sorted, which gives
+  the suits a canonical order, and packed 13 bits apart.
+
+      Parameters:
+          hand(list of cards) - the cards of the hand
+
+      Returns:
+          (int) - the canonical key of the hand (less than 2^52)
+
+  """
+  masks = [0, 0, 0, 0]
+  for card in hand:
+    masks[card & 3] |= 1 << (card >> 2)
+  masks.sort()
+  return masks[3] << 39 | masks[2] << 26 | masks[1] << 13 | masks[0]
+
+class HandCache:
+  """ Object to remember the most recently used results by key """
+  def __init__(self, maxSize=1 << 16):
+    """
+    Starts an empty cache
+
+        Parameters:
+            maxSize(int) - the most results kept at once, 0 keeps none
+
+    """
+    if maxSize < 0:
+      raise RuntimeError("the cache size cannot be negative")
+    self._results = OrderedDict()
+    self._maxSize = maxSize
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  def get(self, key):
+    """
+    Looks up a result and marks it as the most recently used
+
+        Parameters:
+            key(int) - the key of the result
+
+        Returns:
+            (int) - the result, or None if it is not in the cache
+
+    """
+    result = self._results.get(key)
+    if result is None:
+      self._misses += 1
+      return None
+    self._hits += 1
+    self._results.move_to_end(key)
+    return result
+
+  def put(self, key, result):
+    """
+    Adds a result, dropping the least recently used one if the cache is
+    full
+
+        Parameters:
+            key(int) - the key of the result
+            result(int) - the result, cannot be None
+
+    """
+    if self._maxSize == 0:
+      return
+    self._results[key] = result
+    self._results.move_to_end(key)
+    if len(self._results) > self._maxSize:
+      self._results.popitem(last=False)
+      self._evictions += 1
+
+  def clear(self):
+    """ Drops every result and resets the counters """
+    self._results.clear()
+    self._hits = 0
+    self._misses = 0
+    self._evictions = 0
+
+  def setMaxSize(self, maxSize):
+    """
+    Changes the most results kept at once, dropping the least recently
+    used results that no longer fit
+
+        Parameters:
+            maxSize(int) - the most results kept at once, 0 keeps none
+
+    """
+    if maxSize < 0:
+      raise RuntimeError("the cache size cannot be negative")
+    self._maxSize = maxSize
+    while len(self._results) > maxSize:
+      self._results.popitem(last=False)
+      self._evictions += 1
+
+  def getMaxSize(self):
+    """
+    Gets the most results kept at once
+
+        Returns:
+            (int) - the size limit of the cache
+
+    """
+    return self._maxSize
+
+  def getSize(self):
+    """
+    Gets the number of results in the cache
+
+        Returns:
+            (int) - the number of results
+
+    """
+    return len(self._results)
+
+  def getHits(self):
+    """
+    Gets the number of lookups that found a result
+
+        Returns:
+            (int) - the number of hits
+
+    """
+    return self._hits
+
+  def getMisses(self):
+    """
+    Gets the number of lookups that found nothing
+
+        Returns:
+            (int) - the number of misses
+
+    """
+    return self._misses
+
+  def getEvictions(self):
+    """
+    Gets the number of results dropped to make room
+
+        Returns:
+            (int) - the number of evictions
+
+    """
+    return self._evictions
+
+  def getHitRate(self):
+    """
+    Gets the fraction of lookups that found a result
+
+        Returns:
+            (float) - the hit rate, 0 before any lookup
+
+    """
+    lookups = self._hits + self._misses
+    if lookups == 0:
+      return 0.0
+    return self._hits / lookups
@@ -0,0 +1,197 @@
+##
+# Author : Christian Garcia
+# Project: Hand history log for poker game
+#
+import os
+import struct
+from collections import namedtuple
+
+# Actions in a record
+FOLD = 1
+CHECK = 2
+RAISE = 3
+COMPUTER_CALL = 4
+COMPUTER_FOLD = 5
+
+# Flags in a record
+PLAYER_FOLDED = 1
+COMPUTER_FOLDED = 2
+
+# A card place that was not dealt
+NO_CARD = 255
+
+# One hand read back from a log, the cards are bytes so list(record.board)
+# gives the cards dealt, NO_CARD for the places that were not dealt
+HandRecord = namedtuple("HandRecord", ["seed", "hand", "playerCards",
+                                       "aiCards", "board", "winner", "flags",
+                                       "actionCount", "actions", "amounts",
+                                       "pot", "balanceBefore",
+                                       "balanceAfter"])
+
+class HandHistory:
+  """ Object to append the hands played to a log file """
+  def __init__(self, path, batch=1024):
+    """
+    Opens the log for appending, writing the header of a new log
+
+        Parameters:
+            path(str) - the log file
+            batch(int) - the number of records kept before they are
+                         written to the file together
+
+    """
+    self._file = open(path, "ab")
+    if self._file.tell() == 0:
+      self._file.write(_HEADER.pack(_MAGIC, _VERSION, RECORD.size))
+    self._buffer = bytearray(batch * RECORD.size)
+    self._batch = batch
+    self._count = 0
+
+  def write(self, seed, hand, playerCards, aiCards, board, actions, pot,
+            balanceBefore, balanceAfter, winner, flags=0):
+    """
+    Adds a hand to the log, it reaches the file with the rest of its batch
+
+        Parameters:
+            seed(int) - the number the deck was seeded with, 0 if it was
+                        not seeded with one
+            hand(int) - the number of shuffles of the deck up to this
+                        hand, so a seeded hand can be dealt again
+            playerCards(list of cards) - the person's hole cards
+            aiCards(list of cards) - the computer's hole cards
+            board(list of cards) - the middle cards dealt, up to 5
+            actions(list of tuples) - each action and its amount, up to 4
+            pot(int) - the money in the pot before it was paid out
+            balanceBefore(int) - the person's balance before the hand
+            balanceAfter(int) - the person's balance after the hand
+            winner(int) - 0 for a tie, 1 if the person won, 2 if the
+                          computer won
+            flags(int) - PLAYER_FOLDED or COMPUTER_FOLDED if the hand
+                         ended with a fold
+
+    """
+    if len(actions) > _ACTIONS:
+      raise RuntimeError("a record holds at most %d actions" % _ACTIONS)
+
+    codes = bytes(code for code, amount in actions)
+    amounts = [amount for code, amount in actions]
+    amounts += [0] * (_ACTIONS - len(amounts))
+    RECORD.pack_into(self._buffer, self._count * RECORD.size,
+                     seed, hand, bytes(playerCards), bytes(aiCards),
+                     bytes(board) + bytes([NO_CARD] * (5 - len(board))),
+                     winner, flags, len(actions), codes, *amounts, pot,
+                     balanceBefore, balanceAfter)
+    self._count += 1
+    if self._count == self._batch:
+      self.flush()
+
+  def flush(self):
+    """ Writes the records kept so far to the file """
+    if self._count:
+      self._file.write(memoryview(self._buffer)[:self._count * RECORD.size])
+      self._count = 0
+    self._file.flush()
+
+  def close(self):
+    """ Writes the records kept so far and closes the file """
+    self.flush()
+    self._file.close()
+
+  def __enter__(self):
+    """
+    Uses the log in a with statement, which closes it however the block
+    ends
+
+        Returns:
+            (HandHistory) - this log
+
+    """
+    return self
+
+  def __exit__(self, errorType, error, trace):
+    """
+    Closes the log at the end of a with statement, so the records kept
+    so far are written even when the block raised
+
+        Parameters:
+            errorType(type) - the type of the error raised, or None
+            error(Exception) - the error raised, or None
+            trace(traceback) - the traceback of the error, or None
+
+    """
+    self.close()
+
+def readHistory(path, batch=4096):
+  """
+  Reads the hands of a log in order
+
+      Parameters:
+          path(str) - the log file
+          batch(int) - the number of records read from the file at once
+
+      Returns:
+          (generator of HandRecords) - the hands, an unfinished record at
+                                       the end of the file is left out
+
+  """
+  with open(path, "rb") as file:
+    _checkHeader(file.read(_HEADER.size))
+    while True:
+      data = file.read(batch * RECORD.size)
+      data = data[:len(data) - len(data) % RECORD.size]
+      if not data:
+        return
+      for fields in RECORD.iter_unpack(data):
+        yield HandRecord(*fields[:9], fields[9:13], *fields[13:])
+
+def mapHistory(path):
+  """
+  Maps the hands of a log into memory as one NumPy array, without reading
+  the file
+
+      Parameters:
+          path(str) - the log file
+
+      Returns:
+          (numpy memmap) - a record array with the fields of HandRecord
+
+  """
+  import numpy as np
+
+  with open(path, "rb") as file:
+    _checkHeader(file.read(_HEADER.size))
+  count = (os.path.getsize(path) - _HEADER.size) // RECORD.size
+  dtype = np.dtype([("seed", "<u8"), ("hand", "<u4"),
+                    ("playerCards", "u1", 2), ("aiCards", "u1", 2),
+                    ("board", "u1", 5), ("winner", "u1"), ("flags", "u1"),
+                    ("actionCount", "u1"), ("actions", "u1", _ACTIONS),
+                    ("amounts", "<u4", _ACTIONS), ("pot", "<u4"),
+                    ("balanceBefore", "<i8"), ("balanceAfter", "<i8")])
+  if count == 0:
+    return np.zeros(0, dtype=dtype)
+  return np.memmap(path, dtype=dtype, mode="r", offset=_HEADER.size,
+                   shape=(count,))
+
+def _checkHeader(header):
+  """
+  Makes sure a file is a log this module can read
+
+      Parameters:
+          header(bytes) - the start of the file
+
+  """
+  if len(header) != _HEADER.size or \
+    _HEADER.unpack(header) != (_MAGIC, _VERSION, RECORD.size):
+    raise RuntimeError("not a hand history log of this version")
+
+# Where the game logs the hands played
+HISTORY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "hands.log")
+
+# Seed, hand number, cards, result, actions, pot and balances in 64 bytes
+RECORD = struct.Struct("<QI2s2s5sBBB4s4IIqq")
+
+_ACTIONS = 4
+_HEADER = struct.Struct("<8sII")
+_MAGIC = b"HANDLOG\0"
+_VERSION = 1
@@ -0,0 +1,131 @@
+##
+# Author : Christian Garcia
+# Project: HandState class for poker game
+#
+from cardfunctions import cardKey, cardBit, keyStrength
+
+class HandState:
+  """ Object to keep track of a hand as its cards are dealt one by one """
+  def __init__(self, cards=()):
+    """
+    Starts a hand with the given cards
+
+        Parameters:
+            cards(list of cards) - the cards the hand starts with, usually
+                                   the two hole cards
+
+    """
+    self._cards = []
+    self._key = 0
+    self._rankCounts = [0] * 13
+    self._suitCounts = [0, 0, 0, 0]
+    self._suitMasks = [0, 0, 0, 0]
+    self._rankMask = 0
+    self._strength = 0
+    for card in cards:
+      self.addCard(card)
+
+  def addCard(self, card):
+    """
+    Adds a card to the hand and updates its strength
+
+        Parameters:
+            card(int) - the card (0-51) being added
+
+    """
+    if len(self._cards) >= 7:
+      raise RuntimeError("cannot hold more than 7 cards")
+
+    bit = cardBit(card)
+    suit = card % 4
+    self._cards.append(card)
+    self._key += cardKey(card)
+    self._rankCounts[bit.bit_length() - 1] += 1
+    self._suitCounts[suit] += 1
+    self._suitMasks[suit] |= bit
+    self._rankMask |= bit
+    self._strength = keyStrength(self._key, self._suitMasks)
+
+  def removeCard(self):
+    """
+    Takes the last added card back out of the hand
+
+        Returns:
+            (int) - the card that was removed
+
+    """
+    if not self._cards:
+      raise RuntimeError("cannot remove a card from an empty hand")
+
+    card = self._cards.pop()
+    bit = cardBit(card)
+    rank = bit.bit_length() - 1
+    suit = card % 4
+    self._key -= cardKey(card)
+    self._rankCounts[rank] -= 1
+    self._suitCounts[suit] -= 1
+    self._suitMasks[suit] &= ~bit
+    if self._rankCounts[rank] == 0:
+      self._rankMask &= ~bit
+    self._strength = keyStrength(self._key, self._suitMasks)
+    return card
+
+  def getStrength(self):
+    """
+    Gets the strength of the best hand that can be made from the cards
+
+        Returns:
+            (int) - the strength, as returned by cardfunctions.handStrength
+
+    """
+    return self._strength
+
+  def getCards(self):
+    """
+    Gets the cards in the hand
+
+        Returns:
+            (list of cards) - the cards in the order they were added
+
+    """
+    return list(self._cards)
+
+  def getRankCounts(self):
+    """
+    Gets the number of cards of each rank
+
+        Returns:
+            (list of int) - the counts from 2 (index 0) up to Ace (index 12)
+
+    """
+    return list(self._rankCounts)
+
+  def getSuitCounts(self):
+    """
+    Gets the number of cards of each suit
+
+        Returns:
+            (list of int) - the counts of each suit (card % 4)
+
+    """
+    return list(self._suitCounts)
+
+  def getRankMask(self):
+    """
+    Gets a mask with a bit set for every rank in the hand
+
+        Returns:
+            (int) - the mask, bit 0 is a 2 and bit 12 is an Ace
+
+    """
+    return self._rankMask
+
+  def getSuitMasks(self):
+    """
+    Gets the rank mask of the cards of each suit
+
+        Returns:
+            (list of int) - the rank mask of each suit (card % 4)
+
+    """
+    return list(self._suitMasks)
@@ -0,0 +1,298 @@
+##
+# Author : Christian Garcia
+# Project: Lookup tables for the hand evaluator
+#
+import os
+import time
+import zlib
+from array import array
+from random import Random
+from tablefile import writeTableFile, mapTableFile
+
+def main():
+  """ Builds the table file used by cardfunctions """
+  start = time.time()
+  writeTables()
+  print("Wrote", TABLE_PATH, "in %.2f seconds" % (time.time() - start))
+
+def loadTables(path=None):
+  """
+  Maps the table file into memory, building the file first if it is
+  missing or out of date
+
+      Parameters:
+          path(str) - the table file, TABLE_PATH by default
+
+      Returns:
+          (tuple) - the flush table, the rank displacements and the rank
+                    table, the strength of a rank key is found at
+                    (key + displacements[key % RANK_BUCKETS]) % RANK_SLOTS
+
+  """
+  if path is None:
+    path = TABLE_PATH
+
+  tables = _readTables(path)
+  if tables is None:
+    try:
+      writeTables(path)
+      tables = _readTables(path)
+    except OSError:
+      tables = None
+
+  # Use the tables straight from memory when the file cannot be written
+  if tables is None:
+    tables = _buildTables()
+  return tables
+
+def writeTables(path=None):
+  """
+  Builds the tables and writes them to a file
+
+      Parameters:
+          path(str) - the table file, TABLE_PATH by default
+
+  """
+  if path is None:
+    path = TABLE_PATH
+
+  flushes, displacements, ranks = _buildTables()
+  writeTableFile(path, _MAGIC, _VERSION,
+                 [_FINGERPRINT, len(flushes), len(displacements), len(ranks)],
+                 [flushes, displacements, ranks])
+
+def _readTables(path):
+  """
+  Maps the tables of a table file into memory without copying them
+
+      Parameters:
+          path(str) - the table file
+
+      Returns:
+          (tuple) - the tables as memoryviews, or None if the file is
+                    missing, damaged or out of date
+
+  """
+  mapped = mapTableFile(path, _MAGIC, _VERSION, 4)
+  if mapped is None:
+    return None
+  fields, view = mapped
+  sizes = (1 << 13, RANK_BUCKETS, RANK_SLOTS)
+  if fields != (_FINGERPRINT,) + sizes or len(view) != 4 * sum(sizes):
+    view.release()
+    return None
+
+  tables = []
+  start = 0
+  for size in sizes:
+    tables.append(view[4 * start:4 * (start + size)].cast('I'))
+    start += size
+  return tuple(tables)
+
+def _buildTables():
+  """
+  Works out the strength of every flush and every set of ranks
+
+      Returns:
+          (tuple) - the flush table, the rank displacements and the rank
+                    table
+
+  """
+  flushes = array('I', [0] * (1 << 13))
+  for mask in range(1 << 13):
+    counts = [(mask >> rank) & 1 for rank in range(13)]
+    if sum(counts) >= 5:
+      flushes[mask] = _bestFive(counts, True)
+
+  strengths = {}
+  _addRanks(strengths, 0, 7, 0, [0] * 13)
+  displacements, ranks = _hashRanks(strengths)
+  return flushes, displacements, ranks
+
+def _hashRanks(strengths):
+  """
+  Packs the strengths of the sets of ranks into a table with no gaps to
+  speak of, using a perfect hash
+
+  The keys are split into buckets by key % RANK_BUCKETS. Every bucket is
+  given a displacement that moves all of its keys (key % RANK_SLOTS) onto
+  free slots, the biggest buckets first. RANK_BUCKETS * RANK_SLOTS is
+  more than any key, so two keys of one bucket never want the same slot.
+
+      Parameters:
+          strengths(dict) - the strength of each rank key
+
+      Returns:
+          (tuple) - the displacement of each bucket and the rank table
+
+  """
+  buckets = [[] for i in range(RANK_BUCKETS)]
+  for key in strengths:
+    buckets[key % RANK_BUCKETS].append(key)
+  order = sorted(range(RANK_BUCKETS),
+                 key=lambda bucket: -len(buckets[bucket]))
+
+  displacements = array('I', [0] * RANK_BUCKETS)
+  ranks = array('I', [0] * RANK_SLOTS)
+  used = bytearray(RANK_SLOTS)
+
+  # Free slots are tried in a fixed random order so buckets do not pile up
+  free = list(range(RANK_SLOTS))
+  Random(0).shuffle(free)
+  size = 0
+  for bucket in order:
+    keys = buckets[bucket]
+    if not keys:
+      break
+    if len(keys) != size:
+      free = [slot for slot in free if not used[slot]]
+      size = len(keys)
+
+    first = keys[0] % RANK_SLOTS
+    for slot in free:
+      if used[slot]:
+        continue
+      displacement = (slot - first) % RANK_SLOTS
+      for key in keys[1:]:
+        if used[(key + displacement) % RANK_SLOTS]:
+          break
+      else:
+        break
+
+    displacements[bucket] = displacement
+    for key in keys:
+      slot = (key + displacement) % RANK_SLOTS
+      used[slot] = 1
+      ranks[slot] = strengths[key]
+
+  return displacements, ranks
+
+def _addRanks(strengths, rank, left, key, counts):
+  """
+  Adds the strength of every set of ranks with no more than 7 cards
+
+      Parameters:
+          strengths(dict) - the strength of each rank key, being filled
+          rank(int) - the next rank to choose a count for
+          left(int) - the number of cards that can still be added
+          key(int) - the rank key of the counts chosen so far
+          counts(list of int) - the counts chosen so far
+
+  """
+  if rank == 13:
+    strengths[key] = _bestFive(counts, False)
+    return
+
+  for count in range(min(4, left) + 1):
+    counts[rank] = count
+    _addRanks(strengths, rank + 1, left - count,
+              key + count * RANK_KEYS[rank], counts)
+  counts[rank] = 0
+
+def _bestFive(counts, flush):
+  """
+  Finds the best hand that can be made from a set of ranks
+
+      Parameters:
+          counts(list of int) - the number of cards of each rank, from
+                                2 (index 0) up to Ace (index 12)
+          flush(bool) - True if all of the cards are of one suit
+
+      Returns:
+          (int) - the strength of the best hand
+
+  """
+  groups = [[], [], [], [], []]
+  mask = 0
+  for rank in range(12, -1, -1):
+    if counts[rank]:
+      groups[counts[rank]].append(rank)
+      mask |= 1 << rank
+  present = [rank for rank in range(12, -1, -1) if counts[rank]]
+
+  # Find the highest card of a straight, the Ace can also play low
+  straightHigh = -1
+  for high in range(12, 3, -1):
+    if (mask >> (high - 4)) & 31 == 31:
+      straightHigh = high
+      break
+  if straightHigh < 0 and mask & 0x100F == 0x100F:
+    straightHigh = 3
+
+  if flush:
+    if straightHigh >= 0:
+      return _encode(STRAIGHT_FLUSH, [straightHigh])
+    return _encode(FLUSH, present[:5])
+
+  quads, trips, pairs, singles = groups[4], groups[3], groups[2], groups[1]
+  if quads:
+    kickers = [rank for rank in present if rank != quads[0]]
+    return _encode(FOUR_OF_A_KIND, [quads[0]] + kickers[:1])
+  if trips and len(trips) + len(pairs) >= 2:
+    return _encode(FULL_HOUSE, [trips[0], max(trips[1:] + pairs)])
+  if straightHigh >= 0:
+    return _encode(STRAIGHT, [straightHigh])
+  if trips:
+    return _encode(THREE_OF_A_KIND, trips + singles[:2])
+  if len(pairs) >= 2:
+    kickers = [rank for rank in present if rank not in pairs[:2]]
+    return _encode(TWO_PAIRS, pairs[:2] + kickers[:1])
+  if pairs:
+    return _encode(PAIR, pairs + singles[:3])
+
+  return _encode(HIGH_CARD, singles[:5])
+
+def _encode(category, ranks):
+  """
+  Packs a hand category and its deciding ranks into one strength
+
+      Parameters:
+          category(int) - the category of the hand
+          ranks(list of int) - the deciding ranks, most important first
+
+      Returns:
+          (int) - the strength of the hand
+
+  """
+  strength = category << CATEGORY_SHIFT
+  shift = CATEGORY_SHIFT
+  for rank in ranks:
+    shift -= 4
+    strength |= (rank + 1) << shift
+  return strength
+
+# Hand categories, the strength of a hand is its category followed by
+# the ranks that break ties within the category
+HIGH_CARD = 0
+PAIR = 1
+TWO_PAIRS = 2
+THREE_OF_A_KIND = 3
+STRAIGHT = 4
+FLUSH = 5
+FULL_HOUSE = 6
+FOUR_OF_A_KIND = 7
+STRAIGHT_FLUSH = 8
+CATEGORY_SHIFT = 20
+
+# Any multiset of at most 7 ranks sums to a different rank key, and every
+# card also adds 2^23 so hands of different sizes never share a key
+RANK_KEYS = [(1 << 23) + key for key in
+             [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349,
+              636345, 1479181]]
+
+# The sizes of the perfect hash of the rank table, the two are coprime
+RANK_BUCKETS = 31991
+RANK_SLOTS = 95003
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "handtables.dat")
+
+_MAGIC = b"HANDTBL\0"
+# Bump the version whenever the strengths that are built change
+_VERSION = 2
+# Any change to the layout of the tables makes old files out of date
+_FINGERPRINT = zlib.crc32(repr((RANK_KEYS, RANK_BUCKETS, RANK_SLOTS,
+                                CATEGORY_SHIFT)).encode())
+
+if __name__ == "__main__":
+  main()
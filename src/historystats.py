@@ -0,0 +1,332 @@
+##
+# Author : Christian Garcia
+# Project: Statistics over hand history logs
+#
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from handhistory import mapHistory, HISTORY_PATH, PLAYER_FOLDED, \
+  COMPUTER_FOLDED
+from pushfold import CLASSES, handClass, className
+
+def main():
+  """ Prints the statistics of a hand history log """
+  parser = argparse.ArgumentParser(description="Sums up a hand history log")
+  parser.add_argument("path", nargs="?", default=HISTORY_PATH,
+                      help="the log to read")
+  parser.add_argument("--workers", type=int,
+                      help="the number of processes, all cores by default")
+  parser.add_argument("--step", type=int, default=_STEP,
+                      help="the number of hands between bankroll points")
+  args = parser.parse_args()
+
+  stats = analyzeHistory(args.path, args.workers, args.step)
+  hands = stats.getHands()
+  if hands == 0:
+    print("No hands in", args.path)
+    return
+  print("%d hands: won %.1f%%, tied %.1f%%, lost %.1f%%, folded %.1f%%" %
+        (hands, 100 * stats.getWinRate(), 100 * stats.getTieRate(),
+         100 * stats.getLossRate(), 100 * stats.getFoldRate()))
+  print("Showdowns %.1f%%, net $%d ($%.2f a hand)" %
+        (100 * stats.getShowdownRate(), stats.getNet(),
+         stats.getNet() / hands))
+
+  # The starting hands that made and lost the most a hand
+  counts, wins, nets = stats.getClassResults()
+  played = [index for index in range(len(counts)) if counts[index]]
+  played.sort(key=lambda index: nets[index] / counts[index])
+  for title, indexes in (("Best", played[::-1][:5]), ("Worst", played[:5])):
+    results = ["%s $%.2f" % (className(index), nets[index] / counts[index])
+               for index in indexes]
+    print(title + ":", ", ".join(results))
+
+def analyzeHistory(path, workers=None, step=None, chunk=None):
+  """
+  Works out the statistics of a log on a pool of processes
+
+  Every process maps the log and sums up its own chunks of records, so no
+  records are sent between processes and only a chunk at a time of each
+  is in memory. The sums of the chunks are merged in order.
+
+      Parameters:
+          path(str) - the log file
+          workers(int) - the number of processes, all cores by default
+          step(int) - the number of hands between points of the bankroll
+                      curve
+          chunk(int) - the number of records summed at a time, rounded
+                       to a whole number of steps
+
+      Returns:
+          (HistoryStats) - the statistics of the whole log
+
+  """
+  if workers is None:
+    workers = os.cpu_count() or 1
+  if step is None:
+    step = _STEP
+  if chunk is None:
+    chunk = _CHUNK
+  chunk = max(chunk // step, 1) * step
+
+  count = len(mapHistory(path))
+  starts = range(0, count, chunk)
+  stats = HistoryStats(step)
+  if workers == 1 or len(starts) < 2:
+    for start in starts:
+      stats.merge(_analyzeChunk(path, start, start + chunk, step))
+    return stats
+
+  with ProcessPoolExecutor(workers) as executor:
+    for partial in executor.map(_analyzeChunk, [path] * len(starts), starts,
+                                [start + chunk for start in starts],
+                                [step] * len(starts)):
+      stats.merge(partial)
+  return stats
+
+def iterateChunks(path, chunk=None):
+  """
+  Streams a log as record arrays of a chunk of hands each
+
+      Parameters:
+          path(str) - the log file
+          chunk(int) - the most records in each array
+
+      Returns:
+          (generator of arrays) - views of the mapped log, in order
+
+  """
+  if chunk is None:
+    chunk = _CHUNK
+  records = mapHistory(path)
+  for start in range(0, len(records), chunk):
+    yield records[start:start + chunk]
+
+class HistoryStats:
+  """ Sums of the hands in a log, which can be merged in the log's order """
+  def __init__(self, step=None):
+    """
+    Starts with no hands
+
+        Parameters:
+            step(int) - the number of hands between points of the bankroll
+                        curve
+
+    """
+    if step is None:
+      step = _STEP
+    self._step = step
+    self._hands = 0
+    self._wins = 0
+    self._ties = 0
+    self._folds = 0
+    self._showdowns = 0
+    self._net = 0
+    self._classCounts = np.zeros(CLASSES, dtype=np.int64)
+    self._classWins = np.zeros(CLASSES, dtype=np.int64)
+    self._classNets = np.zeros(CLASSES, dtype=np.int64)
+    self._curve = []
+
+  def add(self, records):
+    """
+    Adds the hands that come next in the log
+
+        Parameters:
+            records(array) - the records of the hands, as from mapHistory;
+                             the hands before them must be a whole number
+                             of steps
+
+    """
+    if self._hands % self._step:
+      raise RuntimeError("hands must be added a whole number of steps at "
+                         "a time")
+
+    winner = np.asarray(records["winner"])
+    flags = np.asarray(records["flags"])
+    nets = records["balanceAfter"] - records["balanceBefore"]
+    wins = winner == 1
+    classes = _handClasses(np.asarray(records["playerCards"]))
+
+    self._hands += len(records)
+    self._wins += int(wins.sum())
+    self._ties += int((winner == 0).sum())
+    self._folds += int((flags & PLAYER_FOLDED).astype(bool).sum())
+    folded = flags & (PLAYER_FOLDED | COMPUTER_FOLDED)
+    self._showdowns += int((folded == 0).sum())
+    self._classCounts += np.bincount(classes, minlength=CLASSES)
+    self._classWins += np.bincount(classes[wins], minlength=CLASSES)
+    self._classNets += np.bincount(classes, weights=nets,
+                                   minlength=CLASSES).astype(np.int64)
+
+    # The person's net winnings so far after every step hands
+    curve = np.cumsum(nets)[self._step - 1::self._step] + self._net
+    self._curve += curve.tolist()
+    self._net += int(nets.sum())
+
+  def merge(self, other):
+    """
+    Adds the sums of the hands that come next in the log
+
+        Parameters:
+            other(HistoryStats) - the sums of the next hands, with the same
+                                  step
+
+    """
+    if other._step != self._step or self._hands % self._step:
+      raise RuntimeError("only stats with the same step can be merged, "
+                         "after a whole number of steps")
+
+    self._hands += other._hands
+    self._wins += other._wins
+    self._ties += other._ties
+    self._folds += other._folds
+    self._showdowns += other._showdowns
+    self._classCounts += other._classCounts
+    self._classWins += other._classWins
+    self._classNets += other._classNets
+    self._curve += [self._net + net for net in other._curve]
+    self._net += other._net
+
+  def getHands(self):
+    """
+    Gets the number of hands
+
+        Returns:
+            (int) - the number of hands
+
+    """
+    return self._hands
+
+  def getWinRate(self):
+    """
+    Gets the share of hands the person won, by showdown or by the
+    computer folding
+
+        Returns:
+            (float) - the share of hands won
+
+    """
+    return self._wins / max(self._hands, 1)
+
+  def getTieRate(self):
+    """
+    Gets the share of hands that were tied
+
+        Returns:
+            (float) - the share of hands tied
+
+    """
+    return self._ties / max(self._hands, 1)
+
+  def getLossRate(self):
+    """
+    Gets the share of hands the person lost at a showdown
+
+        Returns:
+            (float) - the share of hands lost, folds left out
+
+    """
+    return (self._hands - self._wins - self._ties - self._folds) / \
+      max(self._hands, 1)
+
+  def getFoldRate(self):
+    """
+    Gets the share of hands the person folded
+
+        Returns:
+            (float) - the share of hands folded
+
+    """
+    return self._folds / max(self._hands, 1)
+
+  def getShowdownRate(self):
+    """
+    Gets the share of hands that went to a showdown
+
+        Returns:
+            (float) - the share of hands no one folded
+
+    """
+    return self._showdowns / max(self._hands, 1)
+
+  def getNet(self):
+    """
+    Gets the money the person won less the money they lost
+
+        Returns:
+            (int) - the net winnings
+
+    """
+    return self._net
+
+  def getClassResults(self):
+    """
+    Gets the results of each starting hand class, indexed as by
+    pushfold.handClass
+
+        Returns:
+            (tuple) - the hands, wins and net winnings of each class, as
+                      lists of 169 ints
+
+    """
+    return (self._classCounts.tolist(), self._classWins.tolist(),
+            self._classNets.tolist())
+
+  def getCurve(self):
+    """
+    Gets the person's bankroll curve
+
+        Returns:
+            (list of int) - the net winnings after every step hands
+
+    """
+    return list(self._curve)
+
+def _analyzeChunk(path, start, stop, step):
+  """
+  Sums up a chunk of a log
+
+      Parameters:
+          path(str) - the log file
+          start(int) - the first record of the chunk
+          stop(int) - the record after the chunk
+          step(int) - the number of hands between bankroll points
+
+      Returns:
+          (HistoryStats) - the sums of the chunk
+
+  """
+  stats = HistoryStats(step)
+  records = mapHistory(path)[start:stop]
+  # Add the records a little at a time so only a little is in memory
+  piece = max(_PIECE // step, 1) * step
+  for first in range(0, len(records), piece):
+    stats.add(records[first:first + piece])
+  return stats
+
+def _handClasses(holes):
+  """
+  Gets the starting hand class of many hands at once
+
+      Parameters:
+          holes(array) - the two hole cards of each hand, one row each
+
+      Returns:
+          (array) - the class of each hand, as from pushfold.handClass
+
+  """
+  pairs = holes[:, 0].astype(np.intp) * 52 + holes[:, 1]
+  return _HAND_CLASSES[pairs]
+
+_STEP = 1000
+# Records summed by each job, and by each step within a job
+_CHUNK = 1 << 22
+_PIECE = 1 << 16
+# The class of every ordered pair of cards, looked up by first * 52 + second
+_HAND_CLASSES = np.array([handClass([first, second]) if first != second else 0
+                          for first in range(52) for second in range(52)],
+                         dtype=np.intp)
+
+if __name__ == "__main__":
+  main()
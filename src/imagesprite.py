@@ -4,7 +4,7 @@
 #
 import pygame
 
-class ImageSprite(pygame.sprite.Sprite):
+class ImageSprite(pygame.sprite.DirtySprite):
   """ Object to represent a sprite """
   def __init__(self, x, y, filename):
     """ 
@@ -13,11 +13,15 @@ class ImageSprite(pygame.sprite.Sprite):
         Parameters:
             x(int) - the x coordinate of the left side of the sprite
             y(int) - the y coordinate of the top of the sprite
-            filename(str) - the path/name of the object's image file
+            filename(str) - the path/name of the object's image file, or
+                            an image that is already loaded (Surface)
 
     """
     super().__init__()
-    self.loadImage(x, y, filename)
+    if isinstance(filename, pygame.Surface):
+      self.setImage(x, y, filename)
+    else:
+      self.loadImage(x, y, filename)
 
   def loadImage(self, x, y, filename):
     """ 
@@ -30,10 +34,24 @@ class ImageSprite(pygame.sprite.Sprite):
 
     """
     img = pygame.image.load(filename).convert()
-    self.image = img
+    self.setImage(x, y, img)
+
+  def setImage(self, x, y, image):
+    """ 
+    Shows an image that is already loaded, such as one shared by many
+    sprites
+
+        Parameters:
+            x(int) - the x coordinate of the left side of the object
+            y(int) - the y coordinate of the bottom of the object
+            image(Surface) - the image
+
+    """
+    self.image = image
     self.rect = self.image.get_rect()
     self.rect.x = x
     self.rect.y = y - self.rect.height
+    self.dirty = 1
 
   def moveBy(self, dx, dy):
     """
@@ -45,4 +63,5 @@ class ImageSprite(pygame.sprite.Sprite):
 
     """
     self.rect.x += dx
-    self.rect.y += dy
\ No newline at end of file
+    self.rect.y += dy
+    self.dirty = 1
\ No newline at end of file
@@ -0,0 +1,112 @@
+##
+# Author : Christian Garcia
+# Project: JobRunner class for poker game
+#
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import pygame
+
+# The event posted when a job finishes
+JOB_DONE = pygame.event.custom_type()
+
+class JobRunner:
+  """ Object to run slow work away from the game loop """
+  def __init__(self, workers=1, processes=False):
+    """
+    Initializes the variables for the runner, the pool is started with
+    the first job
+
+        Parameters:
+            workers(int) - the number of threads or processes
+            processes(bool) - True to run jobs in processes, which suits
+                              long pure Python work; jobs and their
+                              results must then be picklable
+
+    """
+    self._workers = workers
+    self._processes = processes
+    self._executor = None
+    self._futures = set()
+    self._generation = 0
+    self._lock = threading.Lock()
+
+  def submit(self, tag, function, *args):
+    """
+    Starts a job, a JOB_DONE event with its tag and result is posted
+    when it finishes
+
+        Parameters:
+            tag(str) - names the job in its event
+            function(function) - the work to do
+            args - the arguments of the function
+
+        Returns:
+            (Future) - the future of the job
+
+    """
+    if self._executor is None:
+      if self._processes:
+        self._executor = ProcessPoolExecutor(self._workers)
+      else:
+        self._executor = ThreadPoolExecutor(self._workers)
+
+    generation = self._generation
+    future = self._executor.submit(function, *args)
+    with self._lock:
+      self._futures.add(future)
+    future.add_done_callback(
+      lambda done: self._post(done, tag, generation))
+    return future
+
+  def cancelAll(self):
+    """
+    Cancels every job that has not started and drops the results of the
+    jobs that are running, for example when a new hand starts
+    """
+    with self._lock:
+      self._generation += 1
+      futures = list(self._futures)
+    for future in futures:
+      future.cancel()
+
+  def isCurrent(self, event):
+    """
+    Checks if a JOB_DONE event comes from a job that was not cancelled
+
+        Parameters:
+            event(Event) - a JOB_DONE event
+
+        Returns:
+            (bool) - True if the result should still be used
+
+    """
+    return event.generation == self._generation
+
+  def shutdown(self):
+    """ Cancels the jobs and stops the pool """
+    self.cancelAll()
+    if self._executor is not None:
+      self._executor.shutdown(wait=False, cancel_futures=True)
+      self._executor = None
+
+  def _post(self, future, tag, generation):
+    """
+    Posts the result of a finished job as an event, this runs on the
+    thread that finished the job
+
+        Parameters:
+            future(Future) - the finished job
+            tag(str) - names the job
+            generation(int) - the generation the job was started in
+
+    """
+    with self._lock:
+      self._futures.discard(future)
+      if future.cancelled() or generation != self._generation:
+        return
+
+    error = future.exception()
+    result = None if error is not None else future.result()
+    pygame.event.post(pygame.event.Event(JOB_DONE, tag=tag, result=result,
+                                         error=error,
+                                         generation=generation))
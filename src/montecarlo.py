@@ -0,0 +1,216 @@
+##
+# Author : Christian Garcia
+# Project: Monte Carlo equity
+#
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from batchfunctions import handStrengths
+
+def main():
+  """ Estimates a three-way preflop spot and a hand against a range """
+  equities, margins, samples = estimateEquity([[[0, 1]], [[48, 49]],
+                                               [[44, 45]]],
+                                              samples=200000, seed=1)
+  print("AA vs KK vs QQ over", samples, "samples:")
+  for equity, margin in zip(equities, margins):
+    print("  %.2f%% +/- %.2f%%" % (100 * equity, 100 * margin))
+
+  # Any pair against AK of any suits
+  pairs = [[4 * rank + a, 4 * rank + b] for rank in range(13)
+           for a in range(4) for b in range(a + 1, 4)]
+  bigSlick = [[a, 48 + b] for a in range(4) for b in range(4)]
+  equities, margins, samples = estimateEquity([pairs, bigSlick],
+                                              timeLimit=1.0, seed=2)
+  print("Pairs vs AK over", samples, "samples in 1 second:")
+  for equity, margin in zip(equities, margins):
+    print("  %.2f%% +/- %.2f%%" % (100 * equity, 100 * margin))
+
+def estimateEquity(ranges, board=(), dead=(), samples=None, timeLimit=None,
+                   workers=None, seed=None):
+  """
+  Estimates the equity of each player by dealing random hands and runouts
+
+      Parameters:
+          ranges(list of ranges) - the hands each player can hold, a range
+                                   is a list of two-card hands and a known
+                                   hand is a range with one hand
+          board(list of cards) - the middle cards dealt so far (0-5)
+          dead(list of cards) - cards that are known to be out of the deck
+          samples(int) - the number of deals to sample
+          timeLimit(float) - the number of seconds each worker keeps
+                             sampling for once it has started, after a
+                             first batch that is always sampled
+          workers(int) - the number of processes, all cores by default
+          seed(int) - seeds the random streams of the workers
+
+      Returns:
+          (tuple) - the equity of each player, the half width of its 95%
+                    confidence interval, and the number of deals sampled
+
+  """
+  if samples is None and timeLimit is None:
+    samples = _DEFAULT_SAMPLES
+  if len(board) > 5:
+    raise RuntimeError("the board cannot have more than 5 cards")
+  if workers is None:
+    workers = os.cpu_count() or 1
+
+  # Hands that hold a board or dead card can never be dealt
+  known = set(board) | set(dead)
+  ranges = [[hand for hand in playerRange if not known & set(hand)]
+            for playerRange in ranges]
+  for playerRange in ranges:
+    if not playerRange:
+      raise RuntimeError("a range has no hand that can be dealt")
+  if not _canDeal(ranges):
+    raise RuntimeError("the ranges cannot be dealt without sharing a card")
+
+  # Every worker gets its own independent random stream
+  streams = np.random.SeedSequence(seed).spawn(workers)
+  jobs = []
+  for i in range(workers):
+    workerSamples = None
+    if samples is not None:
+      workerSamples = samples // workers + (i < samples % workers)
+    jobs.append((ranges, list(board), list(dead), workerSamples, timeLimit,
+                 streams[i]))
+
+  if workers == 1:
+    results = [_sampleEquity(*jobs[0])]
+  else:
+    with ProcessPoolExecutor(workers) as executor:
+      results = list(executor.map(_sampleEquity, *zip(*jobs)))
+
+  # Merge the sums of all workers
+  totals = np.zeros(len(ranges))
+  squares = np.zeros(len(ranges))
+  count = 0
+  for workerTotals, workerSquares, workerCount in results:
+    totals += workerTotals
+    squares += workerSquares
+    count += workerCount
+  if count == 0:
+    raise RuntimeError("no deals were sampled")
+
+  equities = totals / count
+  variances = np.maximum(squares / count - equities ** 2, 0)
+  margins = 1.96 * np.sqrt(variances / count)
+  return equities.tolist(), margins.tolist(), count
+
+def _sampleEquity(ranges, board, dead, samples, timeLimit, stream):
+  """
+  Samples deals in batches until enough were sampled or time runs out
+
+      Parameters:
+          ranges(list of ranges) - the hands each player can hold
+          board(list of cards) - the middle cards dealt so far
+          dead(list of cards) - cards that are known to be out of the deck
+          samples(int) - the number of deals to sample, or None
+          timeLimit(float) - the number of seconds to sample for, or
+                             None
+          stream(SeedSequence) - the seed of this worker's random stream
+
+      Returns:
+          (tuple) - the sum of each player's share of the pot, the sum of
+                    the squared shares, and the number of deals sampled
+
+  """
+  # Start the clock here, so starting the processes does not use up
+  # the time
+  deadline = None
+  if timeLimit is not None:
+    deadline = time.time() + timeLimit
+  rng = np.random.default_rng(stream)
+  rangeArrays = [np.array(playerRange, dtype=np.int64)
+                 for playerRange in ranges]
+  fixed = np.array(list(board) + list(dead), dtype=np.int64)
+  boardCards = np.array(board, dtype=np.int64)
+  left = 5 - len(board)
+
+  totals = np.zeros(len(ranges))
+  squares = np.zeros(len(ranges))
+  count = 0
+  emptyBatches = 0
+  while samples is None or count < samples:
+    # Always sample something, however short the time
+    if deadline is not None and count and time.time() >= deadline:
+      break
+    size = _BATCH_SIZE
+    if samples is not None:
+      size = min(size, samples - count)
+
+    # Pick a hand for every player and throw away deals that share a card
+    holes = [playerRange[rng.integers(len(playerRange), size=size)]
+             for playerRange in rangeArrays]
+    used = np.zeros(size, dtype=np.uint64)
+    clash = np.zeros(size, dtype=bool)
+    for hole in holes:
+      masks = np.left_shift(np.uint64(1), hole.astype(np.uint64))
+      masks = masks[:, 0] | masks[:, 1]
+      clash |= (used & masks) != 0
+      used |= masks
+    holes = [hole[~clash] for hole in holes]
+    size = len(holes[0])
+    if size == 0:
+      # Give up on ranges that almost never make a deal
+      emptyBatches += 1
+      if emptyBatches == _MAX_EMPTY_BATCHES:
+        raise RuntimeError("almost every deal of the ranges shares a card")
+      continue
+    emptyBatches = 0
+
+    # Deal the rest of the board from the cards nobody holds
+    keys = rng.random((size, 52))
+    keys[:, fixed] = 2
+    rows = np.arange(size)[:, None]
+    for hole in holes:
+      keys[rows, hole] = 2
+    runouts = np.argpartition(keys, left, axis=1)[:, :left]
+    middle = np.hstack([np.broadcast_to(boardCards, (size, len(board))),
+                        runouts])
+
+    # Everyone with the best hand shares the pot
+    strengths = np.array([handStrengths(np.hstack([hole, middle]))
+                          for hole in holes])
+    winners = strengths == strengths.max(axis=0)
+    shares = winners / winners.sum(axis=0)
+    totals += shares.sum(axis=1)
+    squares += (shares ** 2).sum(axis=1)
+    count += size
+
+  return totals, squares, count
+
+def _canDeal(ranges, used=0):
+  """
+  Checks if every player can be dealt a hand from their range without two
+  players sharing a card
+
+      Parameters:
+          ranges(list of ranges) - the hands each player can hold
+          used(int) - the bits of the cards dealt to earlier players
+
+      Returns:
+          (bool) - True if at least one deal exists
+
+  """
+  if not ranges:
+    return True
+  tried = set()
+  for a, b in ranges[0]:
+    mask = (1 << a) | (1 << b)
+    if used & mask or mask in tried:
+      continue
+    tried.add(mask)
+    if _canDeal(ranges[1:], used | mask):
+      return True
+  return False
+
+_DEFAULT_SAMPLES = 100000
+_BATCH_SIZE = 10000
+# Batches in a row with no deal before sampling gives up
+_MAX_EMPTY_BATCHES = 100
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,411 @@
+##
+# Author : Christian Garcia
+# Project: PokerEngine class for poker game
+#
+from cardfunctions import bestHand, compareHands
+from handstate import HandState
+from equity import equity
+from deck import Deck
+from handhistory import FOLD, CHECK, RAISE, COMPUTER_CALL, COMPUTER_FOLD, \
+  PLAYER_FOLDED, COMPUTER_FOLDED
+
+# States of a hand
+FLOP = 0
+TURN = 1
+HAND_OVER = 2
+
+class PokerEngine:
+  """ Object to play hands of Texas Hold 'Em against the computer """
+  minWage = 20
+  def __init__(self, person, deck=None, ai=None, history=None):
+    """
+    Initializes the variables for the engine, no hand is dealt yet
+
+        Parameters:
+            person(Person) - the person playing against the computer
+            deck(Deck) - the deck to deal from, a new one by default
+            ai(AiPlayer) - decides whether the computer calls a raise,
+                           the computer always calls when None
+            history(HandHistory) - logs every hand once it is over,
+                                   nothing is logged when None
+
+    """
+    if deck is None:
+      deck = Deck()
+    self._player = person
+    self._deck = deck
+    self._ai = ai
+    self._history = history
+    self._hands = 0
+    self._actions = []
+    self._balanceBefore = 0
+    self._aiThinking = False
+    self._aiFolded = False
+    self._pot = 0
+    self._bet = 0
+    self._playerCards = []
+    self._aiCards = []
+    self._middleCards = []
+    self._playerHand = HandState()
+    self._aiHand = HandState()
+    self._equity = None
+    self._winner = None
+    self._folded = False
+    self._state = HAND_OVER
+
+  def canPlay(self):
+    """
+    Checks if the person has enough money to pay for a new hand
+
+        Returns:
+            (bool) - True if the person can pay the minimum wage
+
+    """
+    return self._player.getBalance() >= self.minWage
+
+  def newHand(self):
+    """
+    Takes the minimum wage from both players, shuffles the deck and
+    deals the hole cards and the three opening middle cards
+    """
+    if not self.canPlay():
+      raise RuntimeError("Person doesn't have enough cash to play")
+
+    self._hands += 1
+    self._actions = []
+    self._balanceBefore = self._player.getBalance()
+    self._player.lose(self.minWage)
+    self._pot = 2 * self.minWage
+    self._resetBet()
+    self._deck.shuffle()
+
+    self._playerCards = self._deck.draw(2)
+    self._aiCards = self._deck.draw(2)
+    self._player.setHand(self._playerCards)
+    self._playerHand = HandState(self._playerCards)
+    self._aiHand = HandState(self._aiCards)
+    self._middleCards = []
+    for card in self._deck.draw(3):
+      self._addMiddleCard(card)
+
+    self._winner = None
+    self._folded = False
+    self._aiThinking = False
+    self._aiFolded = False
+    self._state = FLOP
+
+  def fold(self):
+    """ Gives up the hand, the computer takes the pot """
+    self._checkPlaying()
+    self._actions.append((FOLD, 0))
+    self._winner = 2
+    self._folded = True
+    self._record(PLAYER_FOLDED)
+    self._pot = 0
+    self._state = HAND_OVER
+
+  def check(self):
+    """ Moves on to the next middle card without betting """
+    self._checkPlaying()
+    self._actions.append((CHECK, 0))
+    self._nextStreet()
+
+  def raiseBet(self):
+    """
+    Bets the current bet and moves on to the next middle card once the
+    computer calls
+
+    With an AiPlayer the computer has to think first (see think) and may
+    fold. There is no betting after the computer's answer, so it calls
+    when it would rather raise.
+    """
+    self._checkPlaying()
+    if self._player.getBalance() < self._bet:
+      self._actions.append((CHECK, 0))
+      self._nextStreet()
+      return
+
+    self._actions.append((RAISE, self._bet))
+    self._player.lose(self._bet)
+    self._pot += self._bet
+    if self._ai is None:
+      self._aiCall()
+      return
+
+    self._ai.startDecision(self._aiCards, self._middleCards,
+                           self._pot, self._bet)
+    self._aiThinking = True
+
+  def think(self, seconds=None):
+    """
+    Lets the computer think about the person's raise for a while, then
+    plays its answer once it has decided
+
+        Parameters:
+            seconds(float) - the most seconds to think for now, the rest
+                             of the computer's budget by default
+
+        Returns:
+            (bool) - True once the computer has answered
+
+    """
+    if not self._aiThinking:
+      return True
+    if not self._ai.think(seconds):
+      return False
+
+    self._aiThinking = False
+    if self._ai.decide() == "fold":
+      self._actions.append((COMPUTER_FOLD, 0))
+      self._winner = 1
+      self._aiFolded = True
+      self._player.win(self._pot)
+      self._record(COMPUTER_FOLDED)
+      self._pot = 0
+      self._state = HAND_OVER
+    else:
+      self._aiCall()
+    return True
+
+  def isAiThinking(self):
+    """
+    Checks if the computer still has to answer the person's raise
+
+        Returns:
+            (bool) - True while the computer is thinking
+
+    """
+    return self._aiThinking
+
+  def increaseBet(self):
+    """ Adds 10 to the bet if the person can pay it """
+    if self._player.getBalance() >= self._bet + 10:
+      self._bet += 10
+
+  def decreaseBet(self):
+    """ Takes 10 off the bet, keeping it above 0 """
+    if self._bet - 10 > 0:
+      self._bet -= 10
+
+  def doubleBet(self):
+    """ Doubles the bet, or bets everything if that is too much """
+    if self._player.getBalance() >= self._bet * 2:
+      self._bet *= 2
+    else:
+      self._bet = self._player.getBalance()
+
+  def getState(self):
+    """
+    Gets the state of the hand
+
+        Returns:
+            (int) - FLOP or TURN while betting, HAND_OVER once the hand
+                    has been folded or shown down
+
+    """
+    return self._state
+
+  def getPot(self):
+    """
+    Gets the money in the pot
+
+        Returns:
+            (int) - the pot, 0 once it has been paid out
+
+    """
+    return self._pot
+
+  def getBet(self):
+    """
+    Gets the amount the next raise bets
+
+        Returns:
+            (int) - the current bet
+
+    """
+    return self._bet
+
+  def getPlayerCards(self):
+    """
+    Gets the person's hole cards
+
+        Returns:
+            (list of cards) - the two hole cards
+
+    """
+    return list(self._playerCards)
+
+  def getAiCards(self):
+    """
+    Gets the computer's hole cards
+
+        Returns:
+            (list of cards) - the two hole cards
+
+    """
+    return list(self._aiCards)
+
+  def getMiddleCards(self):
+    """
+    Gets the middle cards dealt so far
+
+        Returns:
+            (list of cards) - the middle cards in the order they were dealt
+
+    """
+    return list(self._middleCards)
+
+  def getPlayerHand(self):
+    """
+    Gets the person's hand with the middle cards dealt so far
+
+        Returns:
+            (HandState) - the person's hand
+
+    """
+    return self._playerHand
+
+  def getAiHand(self):
+    """
+    Gets the computer's hand with the middle cards dealt so far
+
+        Returns:
+            (HandState) - the computer's hand
+
+    """
+    return self._aiHand
+
+  def getWinner(self):
+    """
+    Gets who won the hand, as returned by compareHands
+
+        Returns:
+            (int) - 0 for a tie, 1 if the person won, 2 if the computer
+                    won, or None while the hand is being played
+
+    """
+    return self._winner
+
+  def isFolded(self):
+    """
+    Checks if the person folded the hand
+
+        Returns:
+            (bool) - True if the hand ended with the person folding
+
+    """
+    return self._folded
+
+  def isAiFolded(self):
+    """
+    Checks if the computer folded the hand
+
+        Returns:
+            (bool) - True if the hand ended with the computer folding
+
+    """
+    return self._aiFolded
+
+  def getEquity(self):
+    """
+    Gets the person's chances against the computer's hole cards over
+    the middle cards still to come, worked out once for each street
+
+        Returns:
+            (tuple) - the fractions of runouts the person wins, ties and
+                      loses
+
+    """
+    if self._equity is None:
+      self._equity = equity(self._playerCards, self._aiCards,
+                            self._middleCards)
+    return self._equity
+
+  def getWinningCards(self):
+    """
+    Finds the cards making the winning hand, both hands on a tie
+
+        Returns:
+            (list of cards) - the winning cards, empty before a showdown
+
+    """
+    if self._winner is None or self._folded or self._aiFolded:
+      return []
+    cards = []
+    if self._winner != 2:
+      cards += bestHand(self._playerHand.getCards())[1]
+    if self._winner != 1:
+      cards += bestHand(self._aiHand.getCards())[1]
+    return cards
+
+  def _checkPlaying(self):
+    """ Makes sure a hand is being played and it is the person's turn """
+    if self._state == HAND_OVER:
+      raise RuntimeError("no hand is being played")
+    if self._aiThinking:
+      raise RuntimeError("the computer has not answered yet")
+
+  def _aiCall(self):
+    """ Matches the person's bet for the computer and deals on """
+    self._actions.append((COMPUTER_CALL, self._bet))
+    self._pot += self._bet
+    self._nextStreet()
+
+  def _nextStreet(self):
+    """ Deals the next middle card, ending with the showdown """
+    self._addMiddleCard(self._deck.draw(1)[0])
+    if self._state == FLOP:
+      self._resetBet()
+      self._state = TURN
+    else:
+      self._showdown()
+      self._state = HAND_OVER
+
+  def _resetBet(self):
+    """ Sets the bet back to 10, or 0 if the person cannot pay 10 """
+    if self._player.getBalance() >= 10:
+      self._bet = 10
+    else:
+      self._bet = 0
+
+  def _addMiddleCard(self, card):
+    """
+    Adds a middle card to the table and to both hands
+
+        Parameters:
+            card(int) - the middle card
+
+    """
+    self._middleCards.append(card)
+    self._playerHand.addCard(card)
+    self._aiHand.addCard(card)
+    self._equity = None
+
+  def _showdown(self):
+    """ Compares the hands and pays out the pot """
+    # Both hands have been kept up to date as the cards were dealt
+    self._winner = compareHands(self._playerHand.getStrength(),
+                                self._aiHand.getStrength())
+    if self._winner == 0:
+      self._player.win(self._pot // 2)
+    elif self._winner == 1:
+      self._player.win(self._pot)
+    self._record()
+    self._pot = 0
+
+  def _record(self, flags=0):
+    """
+    Logs the hand that just ended, before the pot is emptied
+
+        Parameters:
+            flags(int) - PLAYER_FOLDED or COMPUTER_FOLDED if the hand
+                         ended with a fold
+
+    """
+    if self._history is None:
+      return
+    seed = self._deck.getSeed()
+    self._history.write(seed or 0, self._hands, self._playerCards,
+                        self._aiCards, self._middleCards, self._actions,
+                        self._pot, self._balanceBefore,
+                        self._player.getBalance(), self._winner, flags)
@@ -2,21 +2,28 @@
 # Author : Christian Garcia
 # Project: PokerGame
 #
-from cardfunctions import checkHand, compareHands
-from gamebase import GameBase
-from person import Person
+import traceback
+from random import randrange
+from pokerengine import PokerEngine, HAND_OVER
 from deck import Deck
-from card import Card
+from aiplayer import AiPlayer
+from equity import equity
+from handhistory import HandHistory, HISTORY_PATH
+from pushfold import pushFrequency
+from gamebase import GameBase
+from card import CardPool
+from widgets import Label, Button, Outline
 import pygame
 
 # Colors
-LIGHT_GRAY = (230,230,230)
-GRAY = (170,170,170)
-BLACK = (0,0,0)
+HIGHLIGHT = (230,180,0)
+
+# Seconds the computer thinks about a raise in all, and in each frame
+AI_BUDGET = 0.2
+THINK_SLICE = 0.01
 
 class PokerGame(GameBase):
   """ Class to represent a game of Texas Hold 'Em Poker """
-  minWage = 20
   def __init__(self, width, height, person):
     """
     Initializes the variables for the game
@@ -27,101 +34,60 @@ class PokerGame(GameBase):
             person(Person) - the person playing against the computer
 
     """
-    super().__init__(width, height)
+    super().__init__(width, height, dirtyRendering=True)
     pygame.display.set_caption("Texas Hold 'Em")
     self._font = pygame.font.SysFont("Segoe UI",30)
     self._smallfont = pygame.font.SysFont("Segoe UI",20)
     self._player = person
-    self._player.lose(self.minWage)
-    self._pot = self.minWage * 2
-    if self._player.getBalance() >= 10:
-      self._bet = 10
-    else:
-      self._bet = 0
+    self._history = HandHistory(HISTORY_PATH)
+    # A seed of its own for every game, so each logged hand can be dealt
+    # again from its seed and hand number
+    self._engine = PokerEngine(person, Deck(randrange(1, 1 << 64)),
+                               AiPlayer(AI_BUDGET), self._history)
+    self._engine.newHand()
     self._width = width
     self._height = height
-    self._deck = Deck()
-    self._deck.shuffle()
+    self._cardPool = CardPool()
+    self._playerCards = []
     self._middleCards = []
     self._aiCards = []
-    self._state = 0
     self._finalMessage = ""
-
+    self._winningCards = []
+    self._equity = None
+    self._chartHint = ""
+    self._outlines = []
+    self._addWidgets()
 
   def update(self):
     """ Update the game's objects """
     super().update()
 
     if self.getTicks() == 0:
-      self._addOpening()
       self._addUserCards()
       self._addAiCards()
+      self._addOpening()
+      self._startEquity()
+      self._chartHint = self._pushFoldHint()
 
-  def draw(self):
-    """ Draw everything on the screen """
-    super().draw()
-
-    if self._state < 2:
-      # Draw "Fold" Button
-      x = (self._width // 8) * 2 - 50
-      y = (self._height // 6) * 5
-      self._drawButton(x, y, 100, 60, "Fold", self._font)
-
-      # Draw "Check" button
-      x = self._width // 2 - 50
-      self._drawButton(x, y, 100, 60, "Check", self._font)
-
-      # Draw "Raise" button
-      x = (self._width // 8) * 6 - 50
-      self._drawButton(x, y, 100, 60, "Raise", self._font)
-
-      # Draw "+" button
-      x += 110
-      self._drawButton(x, y, 40, 25, "+", self._font)
-
-      # Draw "-" button
-      y += 35
-      self._drawButton(x, y, 40, 25, "-", self._font)
-
-      # Draw "x2" button
-      y -= 35
-      x += 50
-      self._drawButton(x, y, 30, 60, "x2", self._smallfont)
-
-      # Display the current bet
-      x -= 160
-      y -= 40
-      betString = "$%d" % (self._bet)
-      text = self._font.render(betString, True, BLACK)
-      self._display.blit(text, (x,y))
-    elif self._state == 2:
-      # Display the result
-      x = (self._width // 2) - 50
-      y = (8 * self._height // 10)
-      text = self._font.render(self._finalMessage, True, BLACK)
-      self._display.blit(text, (x,y))
-
-      if self._player.getBalance() >= self.minWage:
-        x -= 120
-        y += self._height // 10
-        text = self._font.render("Press Space to Play Again", True, BLACK)
-        self._display.blit(text, (x,y))
+    # Think a little each frame so the game keeps drawing
+    if self._engine.isAiThinking() and self._engine.think(THINK_SLICE):
+      if self._engine.isAiFolded():
+        self._finalMessage = "Computer Folds"
       else:
-        x -= 120
-        y += self._height // 10
-        text = self._font.render("You have run out of money :(", True, BLACK)
-        self._display.blit(text, (x,y))
-
+        self._addNewCards()
 
-    # Display the user's balance
-    userBalance = "Balance: $%d" % (self._player.getBalance())
-    text = self._font.render(userBalance, True, BLACK)
-    self._display.blit(text, (25,25))
+  def run(self):
+    """
+    Runs the game, then writes out the hands still to be logged, even if
+    the game stopped with an error
+    """
+    with self._history:
+      super().run()
 
-    # Display the pot
-    potString = "Pot: $%d" % (self._pot)
-    text = self._font.render(potString, True, BLACK)
-    self._display.blit(text, (25,75))
+  def draw(self):
+    """ Draw everything on the screen """
+    self._updateWidgets()
+    super().draw()
 
   def mouseButtonDown(self, x, y):
     """ 
@@ -132,164 +98,26 @@ class PokerGame(GameBase):
             y(int) - the y coordinate of the mouse position
 
     """
-    # Dimensions of buttons
-    width = 100
-    height = 60
-
-    # Check if "Fold" button was clicked
-    buttonX = (self._width // 8) * 2 - 50
-    buttonY = (self._height // 6) * 5
-
-    if buttonX <= x <= buttonX + width and buttonY <= y <= buttonY + height:
-      if self._state == 0 or self._state == 1:
-        self._finalMessage = "You Lose"
-        self._pot = 0
-        self._state = 2
-
-    # Check if "Check" button was clicked
-    buttonX = self._width // 2 - 50
-    if buttonX <= x <= buttonX + width and buttonY <= y <= buttonY + height:
-      if self._state == 0:
-        self._state += 1
-
-        # Add fourth card
-        self._addFourthCard()
-
-        # Reset bet
-        if self._player.getBalance() >= 10:
-          self._bet = 10
-        else:
-          self._bet = 0
-
-      elif self._state == 1:
-        self._state += 1
-
-        # Add fifth card
-        self._addFifthCard()
-
-        # Turn AI cards
-        for card in self._aiCards:
-          card.flip()
-
-        # Find the best hand value for the user
-        cards = self._player.getHand() + self._middleCards
-        playerCards = []
-        for card in cards:
-          playerCards.append(card.getNumber())
-        playerBest = checkHand(playerCards)
-
-        # Find the best hand value for the computer
-        cards = self._aiCards + self._middleCards
-        computerCards = []
-        for card in cards:
-          computerCards.append(card.getNumber())
-        computerBest = checkHand(computerCards)
-
-        # Determine the winner
-        winner = compareHands(playerBest,computerBest)
-        
-        if winner == 0:
-          self._finalMessage = "Tie Game"
-          self._player.win(self._pot // 2)
-          self._pot = 0
-        elif winner == 1:
-          self._finalMessage = "You Win!"
-          self._player.win(self._pot)
-          self._pot = 0
-        else:
-          self._finalMessage = "You Lose"
-          self._pot = 0
-        
-    # Check if "Raise" button was clicked
-    buttonX = (self._width // 8) * 6 - 50
-    if buttonX <= x <= buttonX + width and buttonY <= y <= buttonY + height:
-      if self._state == 0:
-        self._state += 1
-
-        # Add fourth card
-        self._addFourthCard()
-
-        # Subtract bet amount from player's balance
-        if self._player.getBalance() >= self._bet:
-          self._player.lose(self._bet)
-
-        # Add 2X bet amount to pot
-        self._pot += 2 * self._bet
-
-        # Reset bet
-        if self._player.getBalance() >= 10:
-          self._bet = 10
-        else:
-          self._bet = 0
-
-      elif self._state == 1:
-        self._state += 1
-
-        # Add fifth card
-        self._addFifthCard()
-
-        # Subtract bet amount from player's balance
-        if self._player.getBalance() >= self._bet:
-          self._player.lose(self._bet)
-
-        # Add 2X bet amount to pot
-        self._pot += 2 * self._bet
-
-        # Turn AI cards
-        for card in self._aiCards:
-          card.flip()
-
-        # Find the best hand value for the user
-        cards = self._player.getHand() + self._middleCards
-        playerCards = []
-        for card in cards:
-          playerCards.append(card.getNumber())
-        playerBest = checkHand(playerCards)
-
-        # Find the best hand value for the computer
-        cards = self._aiCards + self._middleCards
-        computerCards = []
-        for card in cards:
-          computerCards.append(card.getNumber())
-        computerBest = checkHand(computerCards)
-
-        # Determine the winner
-        winner = compareHands(playerBest,computerBest)
-        if winner == 0:
-          self._finalMessage = "Tie Game"
-          self._player.win(self._pot // 2)
-          self._pot = 0
-        elif winner == 1:
-          self._finalMessage = "You Win!"
-          self._player.win(self._pot)
-          self._pot = 0
-        else:
-          self._finalMessage = "You Lose"
-          self._pot = 0
-
-    # Check if "+" button is clicked
-    buttonX += 110
-    if buttonX <= x <= buttonX + 40 and buttonY <= y <= buttonY + 25\
-      and self._state < 2:
-      if self._player.getBalance() >= self._bet + 10:
-        self._bet += 10
-
-    # Check if "-" button is clicked
-    buttonY += 35
-    if buttonX <= x <= buttonX + 40 and buttonY <= y <= buttonY + 25\
-      and self._state < 2:
-      if self._bet - 10 > 0:
-        self._bet -= 10
-
-    # Check if "x2" button is clicked
-    buttonX += 50
-    buttonY -= 35
-    if buttonX <= x <= buttonX + 40 and buttonY <= y <= buttonY + 60\
-      and self._state < 2:
-      if self._player.getBalance() >= self._bet * 2:
-        self._bet *= 2
-      else:
-        self._bet = self._player.getBalance()
+    playing = self._engine.getState() != HAND_OVER and \
+      not self._engine.isAiThinking()
+    if not playing:
+      return
+
+    if self._foldButton.contains(x, y):
+      self._engine.fold()
+      self._finalMessage = "You Lose"
+    elif self._checkButton.contains(x, y):
+      self._engine.check()
+      self._addNewCards()
+    elif self._raiseButton.contains(x, y):
+      self._engine.raiseBet()
+      self._addNewCards()
+    elif self._plusButton.contains(x, y):
+      self._engine.increaseBet()
+    elif self._minusButton.contains(x, y):
+      self._engine.decreaseBet()
+    elif self._doubleButton.contains(x, y):
+      self._engine.doubleBet()
 
   def keyDown(self, key):
     """ 
@@ -300,73 +128,111 @@ class PokerGame(GameBase):
 
     """
     if key == pygame.K_SPACE:
-      # Reset variables if user has enough money to play
-      if self._player.getBalance() >= self.minWage:
-        self._player.lose(self.minWage)
-        self._pot = 2 * self.minWage
-      else:
+      # Start a new hand if user has enough money to play
+      if not self._engine.canPlay():
         self.quit()
-
-      if self._player.getBalance() >= 10:
-        self._bet = 10
+        return
 
       super().reset()
-      self._deck.shuffle()
-      self._player.setHand([])
+      self._cardPool.checkInAll()
+      self._outlines = []
+      self._engine.newHand()
+      self._playerCards = []
       self._middleCards = []
       self._aiCards = []
-      self._state = 0
       self._finalMessage = ""
+      self._winningCards = []
+      self._equity = None
       
+  def jobDone(self, tag, result, error=None):
+    """ 
+    Performs the following code when a job finishes
+
+        Parameters:
+            tag(str) - the tag the job was started with
+            result - the value the job returned, None if it failed
+            error(Exception) - the error the job raised, None if it
+                               succeeded
+
+    """
+    if error is not None:
+      # Only a hint is missing, so report the error and play on
+      print("The %s job failed:" % tag)
+      traceback.print_exception(type(error), error, error.__traceback__)
+      return
+    if tag == "equity":
+      self._equity = result
+
+  def _startEquity(self):
+    """ Starts working out the user's chances on the current cards """
+    self._equity = None
+    self.submitJob("equity", equity, self._engine.getPlayerCards(),
+                   self._engine.getAiCards(), self._engine.getMiddleCards())
+
+  def _pushFoldHint(self):
+    """
+    Looks up the user's hole cards in the push or fold charts, which only
+    cover short stacks
+
+        Returns:
+            (str) - the hint, empty when the user's stack is too deep or
+                    the charts have not been written
+
+    """
+    # The stack before the minimum wage was paid, in minimum wages
+    minWage = self._engine.minWage
+    stack = (self._player.getBalance() + minWage) / minWage
+    frequency = pushFrequency(self._engine.getPlayerCards(), stack)
+    if frequency is None:
+      return ""
+    return "Short stack chart: %s" % ("Push" if frequency >= 0.5 else "Fold")
+
   def _addOpening(self):
     """ Creates the 3 middle cards """
-    # Draw 3 cards
-    cards = self._deck.draw(3)
     dx = self._width // 6
     x = 2 * dx - 30
     y = self._height // 2
 
-    # Create the middle card sprites
-    for num in cards:
-      card = Card(x,y,num)
+    # Take the middle card sprites from the pool
+    for num in self._engine.getMiddleCards():
+      card = self._cardPool.checkOut(num, x, y)
       x += dx
-      self._middleCards.append(card)
-      self.add(card)
+      self._addMiddleCard(card)
 
   def _addUserCards(self):
     """ Creates the user's cards """
-    userCards = []
-
-    # Draw 2 cards
-    cards = self._deck.draw(2)
     x = (self._width // 2) - 85
     y = (self._height // 4) * 3 
 
-    # Create player's card sprites
-    for num in cards:
-      card = Card(x,y,num)
+    # Take the player's card sprites from the pool
+    for num in self._engine.getPlayerCards():
+      card = self._cardPool.checkOut(num, x, y)
       x += 100
-      userCards.append(card)
+      self._playerCards.append(card)
       self.add(card)
 
-    # Set the player's hands
-    self._player.setHand(userCards)
-
   def _addAiCards(self):
     """ Creates the computer's cards """
-    # Draw 2 cards
-    cards = self._deck.draw(2)
     x = (self._width // 2) - 85
     y = (self._height // 4)
 
-    # Create computer's card sprites
-    for num in cards:
-      card = Card(x,y,num)
+    # Take the computer's card sprites from the pool
+    for num in self._engine.getAiCards():
+      card = self._cardPool.checkOut(num, x, y)
       x += 100
       card.flip()
       self._aiCards.append(card)
       self.add(card)
 
+  def _addNewCards(self):
+    """ Shows the middle cards the engine has dealt and any showdown """
+    dealt = len(self._engine.getMiddleCards())
+    if len(self._middleCards) == 3 and dealt > 3:
+      self._addFourthCard()
+    if len(self._middleCards) == 4 and dealt > 4:
+      self._addFifthCard()
+      self._showdown()
+
   def _addFourthCard(self):
     """ Creates the fourth middle card """
     # Update position of middle cards
@@ -379,10 +245,10 @@ class PokerGame(GameBase):
       x += dx
 
     # Add fourth middle card
-    cards = self._deck.draw(1)
-    card = Card(x,y,cards[0])
-    self._middleCards.append(card)
-    self.add(card)
+    num = self._engine.getMiddleCards()[3]
+    card = self._cardPool.checkOut(num, x, y)
+    self._addMiddleCard(card)
+    self._startEquity()
 
   def _addFifthCard(self):
     """ Creates the fifth middle card """
@@ -391,35 +257,125 @@ class PokerGame(GameBase):
     y = self._height // 2
 
     # Add fifth middle card
-    cards = self._deck.draw(1)
-    card = Card(x,y,cards[0])
-    self._middleCards.append(card)
-    self.add(card)
+    num = self._engine.getMiddleCards()[4]
+    card = self._cardPool.checkOut(num, x, y)
+    self._addMiddleCard(card)
 
-  def _drawButton(self, x, y, width, height, buttonText, font):
+  def _addMiddleCard(self, card):
     """
-    Creates a button which changes color when hovered over
+    Adds a middle card sprite to the table
 
         Parameters:
-            x(int) - the x coordinate of the left side of the button
-            y(int) - the y coordinate of the top of the button 
-            buttonText(string) - the text for the button
+            card(Card) - the middle card
 
     """
-    # Get the (x,y) coordinates of the mouse
-    mouse = pygame.mouse.get_pos()
+    self._middleCards.append(card)
+    self.add(card)
 
-    # Draw outline for button
-    pygame.draw.rect(self._display, BLACK, [x-1, y-1, width + 2, height + 2])
+  def _showdown(self):
+    """ Turns the computer's cards and shows who won """
+    # Turn AI cards
+    for card in self._aiCards:
+      card.flip()
 
-    # Color of the button changes if mouse is hovered over it
-    if x <= mouse[0] <= x + width and y <= mouse[1] <= y + height:
-      pygame.draw.rect(self._display, GRAY,[x,y,width,height]) 
+    winner = self._engine.getWinner()
+    if winner == 0:
+      self._finalMessage = "Tie Game"
+    elif winner == 1:
+      self._finalMessage = "You Win!"
+    else:
+      self._finalMessage = "You Lose"
+
+    # Keep the sprites of the winning cards to highlight them
+    winningNumbers = self._engine.getWinningCards()
+    cards = self._playerCards + self._aiCards + self._middleCards
+    self._winningCards = [card for card in cards
+                          if card.getNumber() in winningNumbers]
+    self._outlines = [Outline(card.rect.inflate(6, 6), HIGHLIGHT, 3)
+                      for card in self._winningCards]
+
+  def _addWidgets(self):
+    """ Creates the buttons and the text shown on the table """
+    font = self._font
+    smallfont = self._smallfont
+
+    x = (self._width // 8) * 2 - 50
+    y = (self._height // 6) * 5
+    self._foldButton = Button(x, y, 100, 60, "Fold", font)
+    x = self._width // 2 - 50
+    self._checkButton = Button(x, y, 100, 60, "Check", font)
+    x = (self._width // 8) * 6 - 50
+    self._raiseButton = Button(x, y, 100, 60, "Raise", font)
+    self._plusButton = Button(x + 110, y, 40, 25, "+", font)
+    self._minusButton = Button(x + 110, y + 35, 40, 25, "-", font)
+    self._doubleButton = Button(x + 160, y, 30, 60, "x2", smallfont)
+    self._buttons = [self._foldButton, self._checkButton, self._raiseButton,
+                     self._plusButton, self._minusButton, self._doubleButton]
+
+    # The bet and the user's chances sit above the "Raise" button
+    self._betLabel = Label(x, y - 40, font)
+    self._equityLabel = Label(x, y - 65, smallfont)
+
+    # The result and what to do next sit below the table
+    x = (self._width // 2) - 50
+    y = (8 * self._height // 10)
+    self._resultLabel = Label(x, y, font)
+    self._promptLabel = Label(x - 120, y + self._height // 10, font)
+
+    self._balanceLabel = Label(25, 25, font)
+    self._potLabel = Label(25, 75, font)
+    self._hintLabel = Label(25, 125, smallfont)
+
+  def _updateWidgets(self):
+    """
+    Shows the widgets for the state of the hand and gives them their
+    current text, each one is only drawn again if it changed
+    """
+    playing = self._engine.getState() != HAND_OVER
+    mouse = pygame.mouse.get_pos()
+    for button in self._buttons:
+      button.setHovered(button.contains(*mouse))
+    for button in self._buttons:
+      self._showWidget(button, playing)
+
+    self._betLabel.setText("$%d" % (self._engine.getBet()))
+    # Display the user's chances once they have been worked out
+    equityString = "Win --%  Tie --%"
+    if self._equity is not None:
+      win, tie, loss = self._equity
+      equityString = "Win %d%%  Tie %d%%" % (100 * win, 100 * tie)
+    self._equityLabel.setText(equityString)
+    self._showWidget(self._betLabel, playing)
+    self._showWidget(self._equityLabel, playing)
+
+    self._resultLabel.setText(self._finalMessage)
+    if self._engine.canPlay():
+      self._promptLabel.setText("Press Space to Play Again")
     else:
-      pygame.draw.rect(self._display, LIGHT_GRAY,[x,y,width,height])
+      self._promptLabel.setText("You have run out of money :(")
+    self._showWidget(self._resultLabel, not playing)
+    self._showWidget(self._promptLabel, not playing)
+    # Outline the cards making the winning hand
+    for outline in self._outlines:
+      self._showWidget(outline, not playing)
+
+    self._balanceLabel.setText("Balance: $%d" % (self._player.getBalance()))
+    self._potLabel.setText("Pot: $%d" % (self._engine.getPot()))
+    self._hintLabel.setText(self._chartHint)
+    self._showWidget(self._balanceLabel, True)
+    self._showWidget(self._potLabel, True)
+    self._showWidget(self._hintLabel, bool(self._chartHint))
+
+  def _showWidget(self, widget, shown):
+    """
+    Adds a widget to the table or takes it off
 
-    # Draw button text
-    text = font.render(buttonText, True, BLACK)
-    self._display.blit(text, (x + (width/2 - text.get_width()/2),
-        y + (height/2 - text.get_height()/2)))
-    
\ No newline at end of file
+        Parameters:
+            widget(DirtySprite) - the widget
+            shown(bool) - True if the widget should be on the table
+
+    """
+    if shown and not widget.alive():
+      self.add(widget)
+    elif not shown and widget.alive():
+      widget.kill()
@@ -0,0 +1,405 @@
+##
+# Author : Christian Garcia
+# Project: PokerTable class for poker game
+#
+from cardfunctions import showdownStrengths
+from deck import Deck
+from pokerengine import FLOP, TURN, HAND_OVER
+
+class PokerTable:
+  """ Object to play hands of Texas Hold 'Em with 2 to 10 seats """
+  minWage = 20
+  def __init__(self, people, deck=None):
+    """
+    Seats the people at the table, no hand is dealt yet
+
+        Parameters:
+            people(list of Persons) - the person in each seat
+            deck(Deck) - the deck to deal from, a new one by default
+
+    """
+    if not 2 <= len(people) <= 10:
+      raise RuntimeError("a table has 2 to 10 seats")
+    if deck is None:
+      deck = Deck()
+
+    seats = len(people)
+    self._people = list(people)
+    self._deck = deck
+    self._button = seats - 1
+    self._inHand = [False] * seats
+    self._folded = [False] * seats
+    self._liveSeats = 0
+    self._holes = [[] for i in range(seats)]
+    self._middleCards = []
+    # Money put in over the whole hand and on the current street
+    self._contributions = [0] * seats
+    self._streetBets = [0] * seats
+    self._currentBet = 0
+    self._lastRaise = 0
+    self._toAct = []
+    self._winnings = [0] * seats
+    self._state = HAND_OVER
+
+  def canPlay(self):
+    """
+    Checks if at least two people can pay for a new hand
+
+        Returns:
+            (bool) - True if a hand can be dealt
+
+    """
+    return sum(person.getBalance() >= self.minWage
+               for person in self._people) >= 2
+
+  def newHand(self):
+    """
+    Takes the minimum wage from everyone who can pay it, moves the button
+    and deals the hole cards and the three opening middle cards
+
+    People who cannot pay the minimum wage sit the hand out.
+    """
+    if not self.canPlay():
+      raise RuntimeError("not enough people have the cash to play")
+
+    seats = len(self._people)
+    self._inHand = [person.getBalance() >= self.minWage
+                    for person in self._people]
+    self._folded = [False] * seats
+    self._liveSeats = sum(self._inHand)
+    self._contributions = [0] * seats
+    self._winnings = [0] * seats
+    self._holes = [[] for i in range(seats)]
+    self._button = self._nextSeats(self._button, self._inHand)[0]
+
+    self._deck.shuffle()
+    for seat in self._nextSeats(self._button, self._inHand):
+      self._pay(seat, self.minWage)
+      self._holes[seat] = self._deck.draw(2)
+    self._middleCards = self._deck.draw(3)
+
+    self._state = FLOP
+    self._startStreet()
+
+  def fold(self):
+    """ Gives up the hand of the seat to act """
+    seat = self._seatToAct()
+    self._folded[seat] = True
+    self._liveSeats -= 1
+    self._toAct.pop(0)
+    self._afterAction()
+
+  def check(self):
+    """ Passes without betting, only when there is no bet to call """
+    seat = self._seatToAct()
+    if self._streetBets[seat] < self._currentBet:
+      raise RuntimeError("cannot check when there is a bet to call")
+    self._toAct.pop(0)
+    self._afterAction()
+
+  def call(self):
+    """ Matches the current bet, going all in if that is too much """
+    seat = self._seatToAct()
+    amount = min(self._currentBet - self._streetBets[seat],
+                 self._people[seat].getBalance())
+    self._pay(seat, amount)
+    self._toAct.pop(0)
+    self._afterAction()
+
+  def raiseTo(self, amount):
+    """
+    Bets or raises so the seat to act has put in the given amount on
+    this street
+
+        Parameters:
+            amount(int) - the total bet of the seat on this street, it
+                          must raise by at least the last raise unless
+                          the seat goes all in
+
+    """
+    seat = self._seatToAct()
+    cost = amount - self._streetBets[seat]
+    balance = self._people[seat].getBalance()
+    if amount <= self._currentBet:
+      raise RuntimeError("a raise must be more than the current bet")
+    if cost > balance:
+      raise RuntimeError("Person doesn't have enough cash to pay")
+    if amount - self._currentBet < self._lastRaise and cost < balance:
+      raise RuntimeError("a raise must be at least the last raise")
+
+    self._pay(seat, cost)
+    self._lastRaise = max(self._lastRaise, amount - self._currentBet)
+    self._currentBet = amount
+
+    # Everyone else still able to bet has to answer the raise
+    self._toAct = [other for other in self._nextSeats(seat, self._canBet())
+                   if other != seat]
+    self._afterAction()
+
+  def allIn(self):
+    """ Puts in all of the money of the seat to act """
+    seat = self._seatToAct()
+    amount = self._streetBets[seat] + self._people[seat].getBalance()
+    if amount <= self._currentBet:
+      self.call()
+    else:
+      self.raiseTo(amount)
+
+  def getSeatToAct(self):
+    """
+    Gets the seat whose turn it is
+
+        Returns:
+            (int) - the seat to act, or None once the hand is over
+
+    """
+    if self._state == HAND_OVER:
+      return None
+    return self._toAct[0]
+
+  def getToCall(self):
+    """
+    Gets the money the seat to act needs to put in to call
+
+        Returns:
+            (int) - the amount to call, 0 if the seat can check
+
+    """
+    seat = self._seatToAct()
+    return min(self._currentBet - self._streetBets[seat],
+               self._people[seat].getBalance())
+
+  def getMinRaise(self):
+    """
+    Gets the smallest amount the seat to act can raise to
+
+        Returns:
+            (int) - the smallest total bet on this street for a raise
+
+    """
+    return self._currentBet + self._lastRaise
+
+  def getState(self):
+    """
+    Gets the state of the hand
+
+        Returns:
+            (int) - FLOP or TURN while betting, HAND_OVER once the hand
+                    has been won
+
+    """
+    return self._state
+
+  def getHoleCards(self, seat):
+    """
+    Gets the hole cards of a seat
+
+        Parameters:
+            seat(int) - the seat
+
+        Returns:
+            (list of cards) - the two hole cards, empty if the seat sat
+                              the hand out
+
+    """
+    return list(self._holes[seat])
+
+  def getMiddleCards(self):
+    """
+    Gets the middle cards dealt so far
+
+        Returns:
+            (list of cards) - the middle cards in the order they were dealt
+
+    """
+    return list(self._middleCards)
+
+  def getButton(self):
+    """
+    Gets the seat of the button, the last seat to act on each street
+
+        Returns:
+            (int) - the seat of the button
+
+    """
+    return self._button
+
+  def isInHand(self, seat):
+    """
+    Checks if a seat can still win the pot
+
+        Parameters:
+            seat(int) - the seat
+
+        Returns:
+            (bool) - True if the seat was dealt in and has not folded
+
+    """
+    return self._inHand[seat] and not self._folded[seat]
+
+  def getPots(self):
+    """
+    Splits the money put in so far into the main pot and side pots
+
+    Each pot holds what every seat put in up to one all in amount, and
+    only the seats that put in at least that much can win it.
+
+        Returns:
+            (list of tuples) - the money in each pot and the list of seats
+                               that can win it, the main pot first
+
+    """
+    live = self._live()
+    levels = sorted(set(self._contributions[seat] for seat in live))
+
+    pots = []
+    previous = 0
+    for level in levels:
+      amount = 0
+      for contribution in self._contributions:
+        if contribution > previous:
+          amount += min(contribution, level) - previous
+      eligible = [seat for seat in live if self._contributions[seat] >= level]
+      pots.append((amount, eligible))
+      previous = level
+
+    # Money folded above the last all in goes to the last pot
+    extra = sum(max(contribution - previous, 0)
+                for contribution in self._contributions)
+    if extra:
+      amount, eligible = pots[-1]
+      pots[-1] = (amount + extra, eligible)
+    return pots
+
+  def getPot(self):
+    """
+    Gets the money in all of the pots
+
+        Returns:
+            (int) - the money put in this hand, 0 once it is paid out
+
+    """
+    if self._state == HAND_OVER:
+      return 0
+    return sum(self._contributions)
+
+  def getWinnings(self):
+    """
+    Gets the money each seat won from the pots of the last hand
+
+        Returns:
+            (list of int) - the money won by each seat
+
+    """
+    return list(self._winnings)
+
+  def _seatToAct(self):
+    """ Gets the seat to act, making sure a hand is being played """
+    if self._state == HAND_OVER:
+      raise RuntimeError("no hand is being played")
+    return self._toAct[0]
+
+  def _pay(self, seat, amount):
+    """
+    Moves money from a seat into the pot
+
+        Parameters:
+            seat(int) - the seat paying
+            amount(int) - the money being put in
+
+    """
+    self._people[seat].lose(amount)
+    self._contributions[seat] += amount
+    self._streetBets[seat] += amount
+
+  def _live(self):
+    """
+    Lists the seats still in the hand
+
+        Returns:
+            (list of int) - the seats that were dealt in and have not
+                            folded
+
+    """
+    return [seat for seat in range(len(self._people)) if self.isInHand(seat)]
+
+  def _canBet(self):
+    """
+    Finds the seats that can still bet
+
+        Returns:
+            (list of bool) - True for each seat still in the hand with
+                             money left
+
+    """
+    return [self.isInHand(seat) and person.getBalance() > 0
+            for seat, person in enumerate(self._people)]
+
+  def _nextSeats(self, seat, chosen):
+    """
+    Lists the chosen seats in order, starting left of a seat
+
+        Parameters:
+            seat(int) - the seat to start after
+            chosen(list of bool) - True for each seat to list
+
+        Returns:
+            (list of int) - the chosen seats, the given seat last
+
+    """
+    seats = len(self._people)
+    return [other % seats for other in range(seat + 1, seat + seats + 1)
+            if chosen[other % seats]]
+
+  def _startStreet(self):
+    """ Starts the betting on a street, dealing on if no one can bet """
+    self._streetBets = [0] * len(self._people)
+    self._currentBet = 0
+    self._lastRaise = self.minWage
+    canBet = self._canBet()
+    self._toAct = self._nextSeats(self._button, canBet)
+    if sum(canBet) < 2:
+      self._toAct = []
+    self._afterAction()
+
+  def _afterAction(self):
+    """ Ends the street or the hand once no one has to act """
+    if self._liveSeats == 1:
+      self._payPots({self._live()[0]: 0})
+      return
+    if self._toAct:
+      return
+
+    self._middleCards += self._deck.draw(1)
+    if self._state == FLOP:
+      self._state = TURN
+      self._startStreet()
+    else:
+      live = self._live()
+      strengths = showdownStrengths([self._holes[seat] for seat in live],
+                                    self._middleCards)
+      self._payPots(dict(zip(live, strengths)))
+
+  def _payPots(self, strengths):
+    """
+    Pays every pot to the best hands that can win it, odd chips going to
+    the first winners left of the button
+
+        Parameters:
+            strengths(dict) - the strength of each seat still in the hand
+
+    """
+    order = self._nextSeats(self._button, [True] * len(self._people))
+    for amount, eligible in self.getPots():
+      best = max(strengths[seat] for seat in eligible)
+      winners = [seat for seat in order
+                 if seat in strengths and seat in eligible and
+                 strengths[seat] == best]
+      share, odd = divmod(amount, len(winners))
+      for i, seat in enumerate(winners):
+        self._winnings[seat] += share + (i < odd)
+
+    for seat, amount in enumerate(self._winnings):
+      if amount:
+        self._people[seat].win(amount)
+    self._state = HAND_OVER
@@ -0,0 +1,200 @@
+##
+# Author : Christian Garcia
+# Project: Preflop equity table
+#
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, permutations
+from math import comb
+from tablefile import writeTableFile, mapTableFile
+
+def main():
+  """ Builds the preflop equity table """
+  buildTable()
+  print("Wrote", TABLE_PATH)
+
+def handIndex(hand):
+  """
+  Gets the index (0-1325) of a two-card hand
+
+      Parameters:
+          hand(list of cards) - the two cards, in any order
+
+      Returns:
+          (int) - the index of the hand
+
+  """
+  low, high = min(hand), max(hand)
+  return high * (high - 1) // 2 + low
+
+def indexedHands():
+  """
+  Lists every two-card hand in the order of handIndex
+
+      Returns:
+          (list of tuples) - the HANDS hands, each one at its handIndex
+
+  """
+  hands = [None] * HANDS
+  for hand in combinations(range(52), 2):
+    hands[handIndex(hand)] = hand
+  return hands
+
+def preflopCounts(holeA, holeB):
+  """
+  Looks up how many runouts one hand wins, ties and loses against another
+  with no board dealt
+
+      Parameters:
+          holeA(list of cards) - the first player's two hole cards
+          holeB(list of cards) - the second player's two hole cards
+
+      Returns:
+          (tuple) - the wins, ties and losses of the first hand, or None
+                    if the table has not been built
+
+  """
+  table = _openTable()
+  if table is None:
+    return None
+
+  position = 2 * (handIndex(holeA) * HANDS + handIndex(holeB))
+  wins = table[position]
+  ties = table[position + 1]
+  if wins + ties == 0:
+    return None
+  return wins, ties, _RUNOUTS - wins - ties
+
+def preflopTable():
+  """
+  Gets the whole preflop table, for code that reads every match up
+
+      Returns:
+          (memoryview) - the wins and ties of hand a against hand b at
+                         2 * (a * 1326 + b) and the next position, counted
+                         over tableRunouts() runouts, or None if the table
+                         has not been built
+
+  """
+  return _openTable()
+
+def tableRunouts():
+  """
+  Gets the number of runouts counted for each match up in the table
+
+      Returns:
+          (int) - the number of five-card boards from the other 48 cards
+
+  """
+  return _RUNOUTS
+
+def buildTable(path=None, workers=None):
+  """
+  Works out the equity of every pair of hole cards and writes the table
+
+  Match ups that are the same up to a change of suits have the same
+  equity, so only one match up of each kind is worked out.
+
+      Parameters:
+          path(str) - where to write the table, TABLE_PATH by default
+          workers(int) - the number of processes, all cores by default
+
+  """
+  global _table, _tableChecked
+  from equity import equityCounts
+
+  if path is None:
+    path = TABLE_PATH
+
+  hands = indexedHands()
+
+  # The index of every hand after each change of suits
+  suitChanges = []
+  for suits in permutations(range(4)):
+    suitChanges.append([handIndex([(card // 4) * 4 + suits[card % 4]
+                                   for card in hand]) for hand in hands])
+
+  # Find one match up of each kind and which match ups share it
+  kinds = {}
+  members = []
+  for a in range(HANDS):
+    for b in range(a + 1, HANDS):
+      if set(hands[a]) & set(hands[b]):
+        continue
+
+      # Remember whether the hands come out swapped in the kind
+      kind = None
+      for change in suitChanges:
+        x, y = change[a], change[b]
+        if kind is None or (x, y) < kind:
+          kind, forward = (x, y), True
+        if (y, x) < kind:
+          kind, forward = (y, x), False
+      if kind not in kinds:
+        kinds[kind] = len(kinds)
+      members.append((a, b, kinds[kind], forward))
+
+  pairs = list(kinds)
+  holesA = [hands[a] for a, b in pairs]
+  holesB = [hands[b] for a, b in pairs]
+  with ProcessPoolExecutor(workers) as executor:
+    results = list(executor.map(equityCounts, holesA, holesB,
+                                chunksize=64))
+
+  table = array('I', bytes(8 * HANDS * HANDS))
+  for a, b, kind, forward in members:
+    counts, total = results[kind]
+    wins, ties, losses = counts if forward else counts[::-1]
+
+    table[2 * (a * HANDS + b)] = wins
+    table[2 * (a * HANDS + b) + 1] = ties
+    table[2 * (b * HANDS + a)] = losses
+    table[2 * (b * HANDS + a) + 1] = ties
+
+  writeTableFile(path, _MAGIC, _VERSION, [_RUNOUTS], [table])
+  # Map the new table the next time it is needed, even if an earlier
+  # look found no table
+  _table = None
+  _tableChecked = False
+
+def _openTable():
+  """
+  Maps the table file into memory the first time it is needed
+
+      Returns:
+          (memoryview) - the win and tie counts of every match up, or None
+                         if the file is missing or out of date
+
+  """
+  global _table, _tableChecked
+  if _tableChecked:
+    return _table
+  _tableChecked = True
+
+  mapped = mapTableFile(TABLE_PATH, _MAGIC, _VERSION, 1)
+  if mapped is None:
+    return None
+  fields, view = mapped
+  if fields != (_RUNOUTS,) or len(view) != 8 * HANDS * HANDS:
+    view.release()
+    return None
+
+  _table = view.cast('I')
+  return _table
+
+# The number of two-card hands
+HANDS = 1326
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "preflop.dat")
+
+_RUNOUTS = comb(48, 5)
+_MAGIC = b"PREFLOP\0"
+_VERSION = 2
+
+_table = None
+_tableChecked = False
+
+if __name__ == "__main__":
+  main()
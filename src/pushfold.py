@@ -0,0 +1,307 @@
+##
+# Author : Christian Garcia
+# Project: Push or fold charts for short stacks
+#
+import os
+from array import array
+from preflop import HANDS, indexedHands, preflopTable, tableRunouts
+from tablefile import writeTableFile, mapTableFile
+
+def main():
+  """ Solves the push or fold charts and prints the size of each range """
+  if preflopTable() is None:
+    raise RuntimeError("the preflop table has not been built, "
+                       "run preflop.py first")
+
+  stacks, pushes, calls, exploitability = solve()
+  writeCharts(stacks, pushes, calls)
+  print("Wrote", CHART_PATH)
+
+  combos = [_classCombos(index) for index in range(CLASSES)]
+  for stack, push, call, loss in zip(stacks, pushes, calls, exploitability):
+    pushShare = sum(c * f for c, f in zip(combos, push)) / HANDS
+    callShare = sum(c * f for c, f in zip(combos, call)) / HANDS
+    print("%4.1f BB: push %5.1f%%  call %5.1f%%  (exploitable by %.4f BB)" %
+          (stack, 100 * pushShare, 100 * callShare, loss))
+
+def handClass(hole):
+  """
+  Gets the starting hand class (0-168) of two hole cards
+
+  The classes fill a 13 by 13 grid with the higher rank as the row, the
+  pairs on the diagonal, suited hands right of it and offsuit hands left
+  of it. Aces are high.
+
+      Parameters:
+          hole(list of cards) - the two hole cards
+
+      Returns:
+          (int) - the index of the class
+
+  """
+  first, second = hole
+  high = (first // 4 - 1) % 13
+  low = (second // 4 - 1) % 13
+  if high < low:
+    high, low = low, high
+  if first % 4 == second % 4:
+    return high * 13 + low if high == low else low * 13 + high
+  return high * 13 + low
+
+def className(index):
+  """
+  Gets the usual name of a starting hand class, such as "AKs" or "T9o"
+
+      Parameters:
+          index(int) - the index of the class
+
+      Returns:
+          (str) - the name of the class
+
+  """
+  row, column = divmod(index, 13)
+  if row == column:
+    return _RANK_NAMES[row] * 2
+  if row < column:
+    return _RANK_NAMES[column] + _RANK_NAMES[row] + "s"
+  return _RANK_NAMES[row] + _RANK_NAMES[column] + "o"
+
+def classEquities():
+  """
+  Averages the preflop table into the equity of every class against every
+  other class, counting a tie as half
+
+      Returns:
+          (tuple) - the equities and the number of hand pairs with no card
+                    in common behind each one, as 169 by 169 arrays
+
+  """
+  import numpy as np
+
+  table = preflopTable()
+  if table is None:
+    raise RuntimeError("the preflop table has not been built")
+  counts = np.frombuffer(table, dtype=np.uint32).reshape(HANDS, HANDS, 2)
+  equities = (counts[:, :, 0] + counts[:, :, 1] / 2) / tableRunouts()
+
+  # Two hands can meet only if they share no card
+  hands = indexedHands()
+  masks = np.array([(1 << a) | (1 << b) for a, b in hands], dtype=np.int64)
+  valid = ((masks[:, None] & masks[None, :]) == 0).astype(float)
+
+  classes = np.zeros((HANDS, CLASSES))
+  classes[np.arange(HANDS), [handClass(hand) for hand in hands]] = 1
+  weights = classes.T @ valid @ classes
+  totals = classes.T @ (equities * valid) @ classes
+  return totals / weights, weights
+
+def solve(stacks=None, iterations=4000):
+  """
+  Finds the push or fold equilibrium of heads up play for every stack
+
+  The small blind (half a big blind) pushes all in or folds and the big
+  blind calls or folds. Each player's best response to the other's
+  average strategy so far is worked out for all classes and stacks at
+  once, and the averages approach the equilibrium (fictitious play).
+
+      Parameters:
+          stacks(list of float) - the stacks in big blinds, STACKS by
+                                  default
+          iterations(int) - the number of best responses to average
+
+      Returns:
+          (tuple) - the stacks, the push and call frequency of every class
+                    at each stack, and how much the small blind could
+                    gain or lose in big blinds a hand by leaving the
+                    charts at each stack
+
+  """
+  import numpy as np
+
+  if stacks is None:
+    stacks = STACKS
+  equities, weights = classEquities()
+  sizes = np.array(stacks, dtype=float)[:, None]
+  # The small blind's gain when called is stack * (2 * equity - 1)
+  called = weights * (2 * equities - 1)
+  rows = weights.sum(axis=1)
+
+  pushes = np.ones((len(stacks), CLASSES))
+  calls = np.ones((len(stacks), CLASSES))
+  for i in range(1, iterations + 1):
+    pushBest = _pushValues(calls, weights, called, sizes) > -0.5 * rows
+    callBest = sizes * (pushes @ called) < pushes @ weights
+    pushes += (pushBest - pushes) / (i + 1)
+    calls += (callBest - calls) / (i + 1)
+
+  # Compare the best push range against the calls with the push range
+  # against the best calls
+  pushValues = _pushValues(calls, weights, called, sizes)
+  bestCalls = (sizes * (pushes @ called) < pushes @ weights).astype(float)
+  bestValue = np.maximum(pushValues, -0.5 * rows).sum(axis=1)
+  worstValue = (pushes * _pushValues(bestCalls, weights, called, sizes) -
+                0.5 * (1 - pushes) * rows).sum(axis=1)
+  exploitability = (bestValue - worstValue) / rows.sum()
+  return list(stacks), pushes, calls, exploitability.tolist()
+
+def writeCharts(stacks, pushes, calls, path=None):
+  """
+  Writes solved charts for pushFrequency and callFrequency to look up
+
+      Parameters:
+          stacks(list of float) - the stacks in big blinds, smallest first
+          pushes(list of lists) - the push frequency of each class at each
+                                  stack
+          calls(list of lists) - the call frequency of each class at each
+                                 stack
+          path(str) - where to write the charts, CHART_PATH by default
+
+  """
+  global _charts, _chartsChecked
+  if path is None:
+    path = CHART_PATH
+
+  parts = [array('d', stacks)]
+  for chart in (pushes, calls):
+    for frequencies in chart:
+      parts.append(array('f', [float(f) for f in frequencies]))
+  writeTableFile(path, _MAGIC, _VERSION, [CLASSES, len(stacks)], parts)
+  # Map the new charts the next time they are needed, even if an earlier
+  # look found none
+  _charts = None
+  _chartsChecked = False
+
+def pushFrequency(hole, stack):
+  """
+  Looks up how often the small blind pushes a hand at a stack
+
+      Parameters:
+          hole(list of cards) - the two hole cards
+          stack(float) - the smaller of the two stacks, in big blinds
+
+      Returns:
+          (float) - the share of the time to push, or None if the stack is
+                    too deep for the charts or they have not been written
+
+  """
+  return _lookUp(0, hole, stack)
+
+def callFrequency(hole, stack):
+  """
+  Looks up how often the big blind calls a push with a hand at a stack
+
+      Parameters:
+          hole(list of cards) - the two hole cards
+          stack(float) - the smaller of the two stacks, in big blinds
+
+      Returns:
+          (float) - the share of the time to call, or None if the stack is
+                    too deep for the charts or they have not been written
+
+  """
+  return _lookUp(1, hole, stack)
+
+def _pushValues(calls, weights, called, sizes):
+  """
+  Works out the small blind's gain from pushing each class
+
+      Parameters:
+          calls(array) - the call frequencies at each stack
+          weights(array) - the hand pairs behind each match up
+          called(array) - the weighted gain per big blind of stack when
+                          called
+          sizes(array) - the stacks, as a column
+
+      Returns:
+          (array) - the gain of each class at each stack, in big blinds
+                    times the hand pairs of the class
+
+  """
+  return (1 - calls) @ weights.T + sizes * (calls @ called.T)
+
+def _classCombos(index):
+  """
+  Counts the hands in a class
+
+      Parameters:
+          index(int) - the index of the class
+
+      Returns:
+          (int) - 6 for a pair, 4 for a suited hand, 12 for an offsuit hand
+
+  """
+  row, column = divmod(index, 13)
+  if row == column:
+    return 6
+  return 4 if row < column else 12
+
+def _lookUp(chart, hole, stack):
+  """
+  Looks up a frequency at the nearest stack of the charts
+
+      Parameters:
+          chart(int) - 0 for pushing, 1 for calling
+          hole(list of cards) - the two hole cards
+          stack(float) - the smaller of the two stacks, in big blinds
+
+      Returns:
+          (float) - the frequency, or None if there is none for the stack
+
+  """
+  charts = _openCharts()
+  if charts is None:
+    return None
+  stacks, frequencies = charts
+  if stack > stacks[-1] + (stacks[-1] - stacks[-2]) / 2:
+    return None
+
+  nearest = min(range(len(stacks)), key=lambda i: abs(stacks[i] - stack))
+  row = chart * len(stacks) + nearest
+  return frequencies[row * CLASSES + handClass(hole)]
+
+def _openCharts():
+  """
+  Maps the charts into memory the first time they are needed
+
+      Returns:
+          (tuple) - the stacks and the push then call frequencies, or None
+                    if the file is missing or out of date
+
+  """
+  global _charts, _chartsChecked
+  if _chartsChecked:
+    return _charts
+  _chartsChecked = True
+
+  mapped = mapTableFile(CHART_PATH, _MAGIC, _VERSION, 2)
+  if mapped is None:
+    return None
+  (classes, count), view = mapped
+  if classes != CLASSES or count < 2 or \
+    len(view) != 8 * count + 8 * count * classes:
+    view.release()
+    return None
+
+  stacks = view[:8 * count].cast('d')
+  frequencies = view[8 * count:].cast('f')
+  _charts = (stacks, frequencies)
+  return _charts
+
+# The number of starting hand classes
+CLASSES = 169
+
+# The stacks of the charts, from 1 to 20 big blinds
+STACKS = [half / 2 for half in range(2, 41)]
+
+CHART_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          "pushfold.dat")
+
+_RANK_NAMES = "23456789TJQKA"
+_MAGIC = b"PUSHFOLD"
+_VERSION = 2
+
+_charts = None
+_chartsChecked = False
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,163 @@
+##
+# Author : Christian Garcia
+# Project: Simulation of many poker tables
+#
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from aiplayer import AiPlayer
+from deck import Deck
+from person import Person
+from pokerengine import PokerEngine, HAND_OVER
+
+def main():
+  """ Plays a thousand tables of a hundred hands each way """
+  for policy in (checkPolicy, raisePolicy):
+    start = time.time()
+    balances, results = runTables(1000, 100, policy, seed=1)
+    seconds = time.time() - start
+    hands = sum(sum(result) for result in results)
+    wins = sum(result[0] for result in results)
+    print("%s: %d hands in %.1f seconds (%.0f hands/s), won %.1f%%, "
+          "average balance $%.0f" %
+          (policy.__name__, hands, seconds, hands / seconds,
+           100 * wins / hands, sum(balances) / len(balances)))
+
+def runTables(tables, hands, policy=None, balance=1000, workers=None,
+              seed=None, aiBudget=None):
+  """
+  Plays many independent tables at once on a pool of processes
+
+  The tables are split into shards and every process plays the tables of
+  a shard in turn, one hand at each table at a time. A shard sends all
+  of its results back in one message once it is done.
+
+      Parameters:
+          tables(int) - the number of tables
+          hands(int) - the most hands played at each table, a table stops
+                       once the person cannot pay the minimum wage
+          policy(function) - picks the person's action from the engine,
+                             "fold", "check" or "raise", checkPolicy by
+                             default; it must be a module level function
+                             so it can be sent to the processes
+          balance(int) - the money each person starts with
+          workers(int) - the number of processes, all cores by default
+          seed(int) - seeds the decks, so a run can be replayed
+          aiBudget(float) - the seconds an AiPlayer thinks before it
+                            answers each raise, the computer always calls
+                            when None
+
+      Returns:
+          (tuple) - the final balance at each table and the wins, ties,
+                    losses and folds at each table
+
+  """
+  if policy is None:
+    policy = checkPolicy
+  if workers is None:
+    workers = os.cpu_count() or 1
+
+  # A few shards for each process keeps them all busy to the end
+  shards = min(tables, 4 * workers)
+  bounds = [tables * i // shards for i in range(shards + 1)]
+  # Every table gets its own random stream, so a run plays the same
+  # however the tables are shared out
+  seeds = np.random.SeedSequence(seed).spawn(tables)
+
+  jobs = [(seeds[bounds[i]:bounds[i + 1]], hands, policy, balance, aiBudget)
+          for i in range(shards)]
+  if workers == 1:
+    shardResults = [_playShard(*job) for job in jobs]
+  else:
+    with ProcessPoolExecutor(workers) as executor:
+      shardResults = list(executor.map(_playShard, *zip(*jobs)))
+
+  balances = []
+  results = []
+  for shardBalances, shardCounts in shardResults:
+    balances += shardBalances.tolist()
+    counts = shardCounts.tolist()
+    results += [counts[i:i + 4] for i in range(0, len(counts), 4)]
+  return balances, results
+
+def checkPolicy(engine):
+  """
+  Checks every street, a policy for runTables
+
+      Parameters:
+          engine(PokerEngine) - the engine of the table
+
+      Returns:
+          (str) - the action
+
+  """
+  return "check"
+
+def raisePolicy(engine):
+  """
+  Raises the bet every street, a policy for runTables
+
+      Parameters:
+          engine(PokerEngine) - the engine of the table
+
+      Returns:
+          (str) - the action
+
+  """
+  return "raise"
+
+def _playShard(seeds, hands, policy, balance, aiBudget):
+  """
+  Plays the tables of one shard
+
+      Parameters:
+          seeds(list of SeedSequences) - the seed of each table's deck
+          hands(int) - the most hands played at each table
+          policy(function) - picks the person's action from the engine
+          balance(int) - the money each person starts with
+          aiBudget(float) - the thinking time of the computer, or None
+
+      Returns:
+          (tuple) - the final balances and the wins, ties, losses and
+                    folds of the tables, packed into arrays
+
+  """
+  people = [Person(balance) for seed in seeds]
+  engines = []
+  for person, seed in zip(people, seeds):
+    ai = None
+    if aiBudget is not None:
+      ai = AiPlayer(aiBudget, seed=int(seed.generate_state(1)[0]))
+    engines.append(PokerEngine(person, Deck(seed), ai))
+  counts = array('q', bytes(8 * 4 * len(seeds)))
+
+  for hand in range(hands):
+    for table, engine in enumerate(engines):
+      if not engine.canPlay():
+        continue
+
+      engine.newHand()
+      while engine.getState() != HAND_OVER:
+        action = policy(engine)
+        if action == "check":
+          engine.check()
+        elif action == "raise":
+          engine.raiseBet()
+          engine.think()
+        elif action == "fold":
+          engine.fold()
+        else:
+          raise RuntimeError("unknown action: %s" % action)
+
+      # Count a win, tie or loss, folds apart from the losses
+      if engine.isFolded():
+        counts[4 * table + 3] += 1
+      else:
+        counts[4 * table + (1, 0, 2)[engine.getWinner()]] += 1
+
+  return array('q', [person.getBalance() for person in people]), counts
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,92 @@
+##
+# Author : Christian Garcia
+# Project: Table files shared by the lookup tables of the poker game
+#
+import mmap
+import os
+import struct
+import zlib
+
+def writeTableFile(path, magic, version, fields, parts):
+  """
+  Writes a table file: a header checking the file, then the tables
+
+  The file is written under a name of its own first and then put in
+  place, so other processes never see half a file.
+
+      Parameters:
+          path(str) - the table file
+          magic(bytes) - 8 bytes naming the kind of file
+          version(int) - the version of the file's layout and contents
+          fields(list of int) - numbers of the file's own kept in the
+                                header, such as the sizes of its tables
+          parts(list of buffers) - the tables, written one after another
+
+  """
+  checksum = 0
+  size = 0
+  for part in parts:
+    part = memoryview(part)
+    checksum = zlib.crc32(part, checksum)
+    size += part.nbytes
+
+  temporary = "%s.%d.tmp" % (path, os.getpid())
+  with open(temporary, "wb") as file:
+    file.write(struct.pack(_header(len(fields)), magic, version, _BYTE_ORDER,
+                           checksum, size, *fields))
+    for part in parts:
+      file.write(part)
+  os.replace(temporary, path)
+
+def mapTableFile(path, magic, version, fieldCount):
+  """
+  Maps the tables of a table file into memory without copying them
+
+      Parameters:
+          path(str) - the table file
+          magic(bytes) - 8 bytes naming the kind of file
+          version(int) - the version of the file's layout and contents
+          fieldCount(int) - the number of fields in the header
+
+      Returns:
+          (tuple) - the fields and a memoryview of the tables, or None if
+                    the file is missing, damaged or out of date
+
+  """
+  try:
+    with open(path, "rb") as file:
+      mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+  except (OSError, ValueError):
+    return None
+
+  header = _header(fieldCount)
+  headerSize = struct.calcsize(header)
+  if len(mapped) < headerSize:
+    mapped.close()
+    return None
+
+  values = struct.unpack_from(header, mapped)
+  view = memoryview(mapped)[headerSize:]
+  if values[:3] != (magic, version, _BYTE_ORDER) or \
+    values[4] != len(view) or values[3] != zlib.crc32(view):
+    view.release()
+    mapped.close()
+    return None
+  return values[5:], view
+
+def _header(fieldCount):
+  """
+  Gets the layout of the header of a table file
+
+      Parameters:
+          fieldCount(int) - the number of fields of the file's own
+
+      Returns:
+          (str) - the struct format of the header
+
+  """
+  return "=8sIIIQ" + "I" * fieldCount
+
+# Tables are written in the machine's own byte order, a file from a
+# machine with the other byte order reads back as a different value
+_BYTE_ORDER = 0x01020304
@@ -0,0 +1,150 @@
+##
+# Author : Christian Garcia
+# Project: Widgets for poker game
+#
+import pygame
+
+# Colors
+LIGHT_GRAY = (230,230,230)
+GRAY = (170,170,170)
+BLACK = (0,0,0)
+
+class Label(pygame.sprite.DirtySprite):
+  """ Sprite showing a line of text, rendered again only when it changes """
+  def __init__(self, x, y, font, text="", color=BLACK):
+    """
+    Initializes the variables for the label
+
+        Parameters:
+            x(int) - the x coordinate of the left side of the text
+            y(int) - the y coordinate of the top of the text
+            font(Font) - the font of the text
+            text(str) - the text
+            color(tuple) - the color of the text
+
+    """
+    super().__init__()
+    self._x = x
+    self._y = y
+    self._font = font
+    self._color = color
+    self._text = None
+    self.setText(text)
+
+  def setText(self, text):
+    """
+    Changes the text, rendering it only if it is different
+
+        Parameters:
+            text(str) - the new text
+
+    """
+    if text == self._text:
+      return
+    self._text = text
+    self.image = self._font.render(text, True, self._color)
+    self.rect = self.image.get_rect(topleft=(self._x, self._y))
+    self.dirty = 1
+
+  def getText(self):
+    """
+    Gets the text of the label
+
+        Returns:
+            (str) - the text
+
+    """
+    return self._text
+
+class Button(pygame.sprite.DirtySprite):
+  """ Sprite showing a button which changes color when hovered over """
+  def __init__(self, x, y, width, height, buttonText, font):
+    """
+    Renders the button in both of its colors
+
+        Parameters:
+            x(int) - the x coordinate of the left side of the button
+            y(int) - the y coordinate of the top of the button
+            width(int) - the width of the button
+            height(int) - the height of the button
+            buttonText(str) - the text for the button
+            font(Font) - the font of the text
+
+    """
+    super().__init__()
+    self._normal = self._render(width, height, buttonText, font, LIGHT_GRAY)
+    self._hover = self._render(width, height, buttonText, font, GRAY)
+    self._hovered = False
+    self.image = self._normal
+    # The image has a one pixel outline around the button
+    self.rect = self.image.get_rect(topleft=(x - 1, y - 1))
+    self._area = pygame.Rect(x, y, width + 1, height + 1)
+
+  def setHovered(self, hovered):
+    """
+    Shows the button in the color for whether the mouse is over it
+
+        Parameters:
+            hovered(bool) - True if the mouse is over the button
+
+    """
+    if hovered == self._hovered:
+      return
+    self._hovered = hovered
+    self.image = self._hover if hovered else self._normal
+    self.dirty = 1
+
+  def contains(self, x, y):
+    """
+    Checks if a point is on the button, its edges included
+
+        Parameters:
+            x(int) - the x coordinate of the point
+            y(int) - the y coordinate of the point
+
+        Returns:
+            (bool) - True if the point is on the button
+
+    """
+    return self._area.collidepoint(x, y)
+
+  def _render(self, width, height, buttonText, font, color):
+    """
+    Draws the button with its outline
+
+        Parameters:
+            width(int) - the width of the button
+            height(int) - the height of the button
+            buttonText(str) - the text for the button
+            font(Font) - the font of the text
+            color(tuple) - the color of the button
+
+        Returns:
+            (Surface) - the image of the button
+
+    """
+    image = pygame.Surface((width + 2, height + 2)).convert()
+    image.fill(BLACK)
+    pygame.draw.rect(image, color, [1, 1, width, height])
+    text = font.render(buttonText, True, BLACK)
+    image.blit(text, (1 + (width/2 - text.get_width()/2),
+                      1 + (height/2 - text.get_height()/2)))
+    return image
+
+class Outline(pygame.sprite.DirtySprite):
+  """ Sprite drawing the outline of a rectangle, such as around a card """
+  def __init__(self, rect, color, width):
+    """
+    Draws the outline
+
+        Parameters:
+            rect(Rect) - the outside of the outline
+            color(tuple) - the color of the outline
+            width(int) - the thickness of the outline
+
+    """
+    super().__init__()
+    self.image = pygame.Surface(rect.size, pygame.SRCALPHA)
+    pygame.draw.rect(self.image, color, self.image.get_rect(), width)
+    self.rect = pygame.Rect(rect)
+    self._layer = 2